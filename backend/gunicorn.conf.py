@@ -0,0 +1,47 @@
+"""
+Gunicorn settings for running the API on every core.
+
+    cd backend && gunicorn server:app -c gunicorn.conf.py
+
+Each worker is its own process with its own event loop, Motor client, log
+listener and background tasks, all created in the lifespan handler after
+fork, so throughput scales with the number of workers. Importing server.py
+opens no connections, which is what makes preload_app safe. It does wrap
+uvicorn's Server.handle_exit so that open event streams end on SIGTERM
+(see close_streams_on_exit in server.py); the forked workers inherit that.
+
+Sizing:
+  WEB_CONCURRENCY      workers (default: one per CPU)
+  MONGO_MAX_POOL_SIZE  connections per worker; MongoDB sees up to
+                       WEB_CONCURRENCY * MONGO_MAX_POOL_SIZE in total
+  MONGO_MIN_POOL_SIZE  connections each worker keeps open when idle
+
+Behind a reverse proxy or ingress, set RATE_LIMIT_TRUST_PROXY=true (see
+server.py): otherwise the contact rate limits see only the proxy's address
+and every visitor shares one per-IP bucket of CONTACT_IP_RATE_PER_MIN.
+
+For /api/metrics to report all workers rather than whichever one answers
+the scrape, point PROMETHEUS_MULTIPROC_DIR at an empty directory before
+starting gunicorn.
+
+Without gunicorn, uvicorn can run the same app with its own process manager:
+
+    cd backend && uvicorn server:app --host 0.0.0.0 --port 8001 --workers 4
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+graceful_timeout = 30
+
+
+def child_exit(server, worker):
+    # Drop the metric files of a worker that is gone so its live gauges do
+    # not linger in the aggregate
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
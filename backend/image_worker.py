@@ -0,0 +1,38 @@
+"""Image transcoding run inside the image process pool.
+
+Kept separate from server.py so pool processes only import Pillow, not the
+web app.
+"""
+
+import os
+
+from PIL import Image
+
+# fmt query value -> Pillow format name
+PIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG", "png": "PNG"}
+
+
+def transcode(source: str, destination: str, width: int, fmt: str, quality: int) -> int:
+    """Resize source to at most ``width`` pixels wide (never upscaling), encode
+    it as ``fmt`` and atomically write it to destination. Returns the size of
+    the written file."""
+    with Image.open(source) as image:
+        image.load()
+        if width and width < image.width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if fmt == "jpg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        options = {"optimize": True}
+        if fmt in ("webp", "jpg"):
+            options["quality"] = quality
+        # Write under a temporary name so readers never see a partial file
+        temporary = f"{destination}.{os.getpid()}.tmp"
+        try:
+            image.save(temporary, PIL_FORMATS[fmt], **options)
+            os.replace(temporary, destination)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+    return os.path.getsize(destination)
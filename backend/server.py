@@ -1,33 +1,354 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from dotenv import load_dotenv
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Path as PathParam, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, ExecutionTimeout
+from bson.decimal128 import Decimal128
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess,
+)
 import os
+import time
+import asyncio
+import contextvars
+import functools
 import logging
+import logging.handlers
+import math
+import queue
+import random
+import re
+import struct
+import sys
+import zlib
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from contextlib import asynccontextmanager, contextmanager
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, ValidationError, create_model
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
 import uuid
-from datetime import datetime
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import json
+import base64
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzip-compressed
+    brotli = None
 
 
+# Rarely used subsystems (SMTP, image processing, Parquet) import their dependencies on first use rather than here, to
+# keep worker cold starts short. benchmarks/cold_start.py measures this.
 ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+if (ROOT_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / '.env')
+
+# Metrics, served in Prometheus text format at /api/metrics
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route',
+    ['method', 'route', 'status'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'HTTP requests currently being served',
+    ['method', 'route'],
+    multiprocess_mode='livesum',
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'HTTP response body size by route',
+    ['method', 'route'],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command round-trip time',
+    ['collection', 'command', 'outcome'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command the driver sends, labelled by collection.
+
+    The collection only appears in the started event, so it is remembered
+    per request id until the matching succeeded/failed event arrives.
+    Called from driver threads; dict operations are atomic under the GIL.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Any, str] = {}
+
+    def started(self, event):
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        self._collections[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else "-"
+        )
+
+    def _observe(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name, outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def succeeded(self, event):
+        self._observe(event, "success")
 
-# MongoDB connection
+    def failed(self, event):
+        self._observe(event, "failure")
+
+mongo_command_metrics = MongoCommandMetrics()
+
+# MongoDB connection. The client is created by the lifespan handler, once
+# per worker process and after any pre-fork, since a Motor client must not
+# be shared across fork(). Pool sizes are per process.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_DB_NAME = os.environ['DB_NAME']
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.environ.get(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+# Logging runs through a queue so handler I/O happens on a listener thread,
+# not on the event loop. Structured fields passed via extra= longer than
+# LOG_FIELD_MAX_LENGTH are handled by LOG_LARGE_FIELD_POLICY: "truncate",
+# "omit", or "sample" (keep the full value for LOG_FIELD_SAMPLE_RATE of the
+# records, truncate the rest).
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_FIELD_MAX_LENGTH = int(os.environ.get('LOG_FIELD_MAX_LENGTH', '256'))
+LOG_LARGE_FIELD_POLICY = os.environ.get('LOG_LARGE_FIELD_POLICY', 'truncate')
+LOG_FIELD_SAMPLE_RATE = float(os.environ.get('LOG_FIELD_SAMPLE_RATE', '0.01'))
+
+# Write-behind for POST /api/status (opt-in). When enabled, status checks are
+# acknowledged as soon as they are buffered and persisted in batches.
+STATUS_WRITE_BEHIND = env_flag('STATUS_WRITE_BEHIND')
+STATUS_BATCH_SIZE = int(os.environ.get('STATUS_BATCH_SIZE', '500'))
+STATUS_FLUSH_INTERVAL = float(os.environ.get('STATUS_FLUSH_INTERVAL_MS', '50')) / 1000
+STATUS_BUFFER_MAX = int(os.environ.get('STATUS_BUFFER_MAX', '10000'))
+
+# Status check retention. With STATUS_RETENTION_DAYS set, a TTL index on
+# timestamp deletes older documents. Before that happens, the archiver
+# (python server.py archive-status-checks, e.g. daily from cron) copies every
+# complete day older than STATUS_ARCHIVE_AFTER_DAYS into a zstd-compressed
+# Parquet file under STATUS_ARCHIVE_DIR/date=YYYY-MM-DD/.
+STATUS_RETENTION_DAYS = int(os.environ.get('STATUS_RETENTION_DAYS', '0'))
+STATUS_ARCHIVE_AFTER_DAYS = int(os.environ.get('STATUS_ARCHIVE_AFTER_DAYS', '30'))
+STATUS_ARCHIVE_DIR = Path(os.environ.get('STATUS_ARCHIVE_DIR', ROOT_DIR / 'archive' / 'status_checks'))
+STATUS_ARCHIVE_CHUNK_SIZE = int(os.environ.get('STATUS_ARCHIVE_CHUNK_SIZE', '50000'))
+
+# Run explain() on every endpoint query at startup and refuse to start if any
+# of them needs a collection scan or an in-memory sort
+VERIFY_QUERY_PLANS = env_flag('VERIFY_QUERY_PLANS')
+
+# Catalog reads are served from memory. Writes through this process refresh
+# the cache immediately; the TTL bounds staleness after writes made by other
+# worker processes.
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', '300'))
+
+# Operator-only endpoints (catalog updates, contact imports, exports,
+# search and the live feed) need "Authorization: Bearer <ADMIN_TOKEN>". Without ADMIN_TOKEN set they
+# are refused outright.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Contact form email notifications. Messages go through the email_outbox
+# collection and are only queued when both SMTP_HOST and CONTACT_NOTIFY_TO
+# are set.
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_STARTTLS = env_flag('SMTP_STARTTLS', True)
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', '10'))
+CONTACT_NOTIFY_FROM = os.environ.get('CONTACT_NOTIFY_FROM', 'noreply@brewhaven.com')
+CONTACT_NOTIFY_TO = os.environ.get('CONTACT_NOTIFY_TO')
+EMAIL_WORKERS = int(os.environ.get('EMAIL_WORKERS', '2'))
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '20'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '8'))
+EMAIL_RETRY_BASE = float(os.environ.get('EMAIL_RETRY_BASE_SECONDS', '5'))
+EMAIL_POLL_INTERVAL = float(os.environ.get('EMAIL_POLL_INTERVAL_SECONDS', '5'))
+
+# Abuse protection for POST /api/contact, checked before any I/O. Limits are
+# per worker process. Rates are in submissions per minute.
+CONTACT_RATE_LIMIT = env_flag('CONTACT_RATE_LIMIT', True)
+CONTACT_IP_RATE = float(os.environ.get('CONTACT_IP_RATE_PER_MIN', '10'))
+CONTACT_IP_BURST = float(os.environ.get('CONTACT_IP_BURST', '10'))
+CONTACT_EMAIL_RATE = float(os.environ.get('CONTACT_EMAIL_RATE_PER_MIN', '2'))
+CONTACT_EMAIL_BURST = float(os.environ.get('CONTACT_EMAIL_BURST', '3'))
+CONTACT_DUPLICATE_WINDOW = float(os.environ.get('CONTACT_DUPLICATE_WINDOW_SECONDS', '300'))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+# Limits are keyed on the client address. Behind a reverse proxy or
+# ingress (as in the standard deployment) every request comes from the
+# proxy's address, so with this off all visitors share one per-IP bucket
+# of CONTACT_IP_RATE per minute. Turn it on there, but only when the proxy
+# sets X-Forwarded-For and clients cannot.
+RATE_LIMIT_TRUST_PROXY = env_flag('RATE_LIMIT_TRUST_PROXY')
+
+# Idempotency-Key support for POST /api/status and POST /api/contact. Keys
+# are remembered for IDEMPOTENCY_TTL seconds in Mongo and the most recent
+# IDEMPOTENCY_CACHE_SIZE of them in memory. A request whose key is still
+# being processed by another worker waits up to IDEMPOTENCY_WAIT seconds; a
+# claim left behind by a crashed worker is taken over after IDEMPOTENCY_LEASE.
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '2000'))
+IDEMPOTENCY_WAIT = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', '5'))
+IDEMPOTENCY_LEASE = float(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '30'))
+
+# Live contact feed at GET /api/contact/stream (Server-Sent Events). Each
+# subscriber buffers at most CONTACT_STREAM_QUEUE_SIZE events before it is
+# dropped as too slow; idle streams get a comment line every
+# CONTACT_STREAM_HEARTBEAT seconds so proxies keep them open.
+CONTACT_STREAM_QUEUE_SIZE = int(os.environ.get('CONTACT_STREAM_QUEUE_SIZE', '64'))
+CONTACT_STREAM_HEARTBEAT = float(os.environ.get('CONTACT_STREAM_HEARTBEAT_SECONDS', '15'))
+CONTACT_STREAM_MAX_SUBSCRIBERS = int(os.environ.get('CONTACT_STREAM_MAX_SUBSCRIBERS', '1000'))
+
+# Placeholder images are rendered once per size/format and kept in a
+# byte-bounded LRU cache. PLACEHOLDER_PREWARM lists WxH sizes rendered at
+# startup (the ones frontend/src/mock.js uses).
+PLACEHOLDER_MAX_DIMENSION = int(os.environ.get('PLACEHOLDER_MAX_DIMENSION', '2000'))
+PLACEHOLDER_CACHE_BYTES = int(os.environ.get('PLACEHOLDER_CACHE_BYTES', str(16 * 1024 * 1024)))
+PLACEHOLDER_PREWARM = os.environ.get('PLACEHOLDER_PREWARM', '1200x600,80x80')
+
+# Resized/transcoded derivatives of the originals in IMAGE_ORIGINALS_DIR are
+# encoded in a process pool and cached on disk, evicting least recently used
+# files once the cache grows past IMAGE_CACHE_MAX_BYTES.
+IMAGE_ORIGINALS_DIR = Path(os.environ.get('IMAGE_ORIGINALS_DIR', ROOT_DIR / 'images'))
+IMAGE_CACHE_DIR = Path(os.environ.get('IMAGE_CACHE_DIR', ROOT_DIR / 'image_cache'))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+IMAGE_MAX_WIDTH = int(os.environ.get('IMAGE_MAX_WIDTH', '4000'))
+
+# Response compression (gzip, or brotli when the package is installed).
+# Bodies under COMPRESSION_MIN_SIZE are sent as is, bodies over
+# COMPRESSION_OFFLOAD_SIZE are compressed in a worker thread, and compressed
+# GET responses are kept in an LRU of COMPRESSION_CACHE_BYTES.
+COMPRESSION_ENABLED = env_flag('COMPRESSION_ENABLED', True)
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_OFFLOAD_SIZE = int(os.environ.get('COMPRESSION_OFFLOAD_SIZE', str(256 * 1024)))
+COMPRESSION_CACHE_BYTES = int(os.environ.get('COMPRESSION_CACHE_BYTES', str(32 * 1024 * 1024)))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+
+# Per-request phase timing. With SERVER_TIMING on, every response carries a
+# Server-Timing header with the time spent in each phase; with
+# SLOW_REQUEST_MS set, requests slower than that are logged with the same
+# breakdown. With both off, span() is a context-var lookup and nothing else.
+SERVER_TIMING = env_flag('SERVER_TIMING')
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '0'))
+
+class RequestTimings:
+    """Phase durations of the current request, in seconds, in first-seen order"""
+
+    __slots__ = ("started", "phases", "handler_started", "endpoint_finished")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.handler_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self) -> str:
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+request_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+class Span:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+
+class NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+NO_SPAN = NoSpan()
+
+def span(name: str):
+    """Time a block as phase ``name`` of the current request, if timing is on"""
+    timings = request_timings.get()
+    return NO_SPAN if timings is None else Span(timings, name)
+
+def timed_endpoint(endpoint):
+    """Wrap an endpoint so the time before it runs (body parsing and
+    validation) and after it returns (response serialization) are recorded.
+    functools.wraps keeps the signature FastAPI reads parameters from."""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        timings = request_timings.get()
+        if timings is None:
+            return await endpoint(*args, **kwargs)
+        if timings.handler_started is not None:
+            timings.add("validate", time.perf_counter() - timings.handler_started)
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings.endpoint_finished = time.perf_counter()
 
-# Create the main app without a prefix
-app = FastAPI()
+    wrapper.timed = True
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """APIRoute that reports validate and serialize phases to RequestTimings"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router builds a second route from the already wrapped endpoint
+        if asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "timed", False):
+            endpoint = timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timings = request_timings.get()
+            if timings is None:
+                return await handler(request)
+            timings.handler_started = time.perf_counter()
+            response = await handler(request)
+            if timings.endpoint_finished is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_finished)
+            return response
+
+        return timed_handler
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=TimedRoute)
 
 
 # Define Models
@@ -39,6 +360,10 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusCheckPage(BaseModel):
+    items: List[StatusCheck]
+    next_cursor: Optional[str] = None
+
 # Contact Form Models
 class ContactSubmission(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -56,72 +381,2672 @@ class ContactSubmissionCreate(BaseModel):
     subject: str = Field(..., min_length=1, max_length=200)
     message: str = Field(..., min_length=10, max_length=2000)
 
+def public_projection(model) -> dict:
+    """Mongo projection returning exactly the fields the model exposes"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+class StoredContactSubmission(ContactSubmission):
+    """A submission read back from Mongo.
+
+    The email was validated by EmailStr when the submission came in, and
+    re-running email validation is most of the cost of listing submissions.
+    """
+    email: str
+
+def model_json_response(adapter: TypeAdapter, data, **kwargs) -> Response:
+    """Validate raw documents in one bulk pass and serialize them with
+    pydantic-core, instead of building a model per row and letting FastAPI
+    validate, jsonable_encode and json.dumps the result again"""
+    with span("serialize"):
+        body = adapter.dump_json(adapter.validate_python(data))
+    return Response(content=body, media_type="application/json", **kwargs)
+
+class ContactSearchHit(StoredContactSubmission):
+    score: float
+
+class ContactSearchPage(BaseModel):
+    items: List[ContactSearchHit]
+    next_page: Optional[int] = None
+
+# Bulk Ingest Models. Imported records may carry their original timestamp,
+# so replayed kiosk queues and migrated data keep their real history.
+class StatusCheckImport(StatusCheckCreate):
+    timestamp: Optional[datetime] = None
+
+class ContactSubmissionImport(ContactSubmissionCreate):
+    timestamp: Optional[datetime] = None
+
+class BulkIngestError(BaseModel):
+    line: int
+    detail: str
+
+class BulkIngestResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkIngestError]
+
+# Analytics Models (read from the rollup buckets)
+class DailyCount(BaseModel):
+    day: str
+    count: int
+
+class KeyCount(BaseModel):
+    key: str
+    count: int
+
+class ContactStats(BaseModel):
+    total: int
+    daily: List[DailyCount]
+    top_subjects: List[KeyCount]
+
+class StatusStats(BaseModel):
+    total: int
+    daily: List[DailyCount]
+    top_clients: List[KeyCount]
+
+class Stats(BaseModel):
+    since: str
+    until: str
+    contact_submissions: ContactStats
+    status_checks: StatusStats
+
+STATUS_CHECK_PROJECTION = public_projection(StatusCheck)
+CONTACT_SUBMISSION_PROJECTION = public_projection(ContactSubmission)
+STATUS_PAGE_ADAPTER = TypeAdapter(StatusCheckPage)
+CONTACT_LIST_ADAPTER = TypeAdapter(List[StoredContactSubmission])
+CONTACT_SEARCH_ADAPTER = TypeAdapter(ContactSearchPage)
+
+# ?fields= on the list endpoints. A field set becomes a Mongo projection and
+# a model holding just those fields, so less is read, validated and sent.
+# Models and adapters are built once per field set (bounded by the caches);
+# the sets the admin views use are built at import time.
+def parse_fields(fields: Optional[str], model) -> Optional[Tuple[str, ...]]:
+    """Requested field names in model order, or None for every field"""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a comma-separated subset of: {', '.join(model.model_fields)}",
+        )
+    selected = tuple(name for name in model.model_fields if name in requested)
+    return None if len(selected) == len(model.model_fields) else selected
+
+def fields_projection(fields: Tuple[str, ...]) -> dict:
+    return {"_id": 0, **{name: 1 for name in fields}}
+
+@functools.lru_cache(maxsize=128)
+def slim_model(model, fields: Tuple[str, ...]):
+    """``model`` cut down to ``fields``, keeping their types and defaults"""
+    return create_model(
+        f"{model.__name__}[{','.join(fields)}]",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields},
+    )
+
+@functools.lru_cache(maxsize=128)
+def contact_list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[slim_model(StoredContactSubmission, fields)])
+
+@functools.lru_cache(maxsize=16)
+def status_page_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    page = create_model(
+        f"StatusCheckPage[{','.join(fields)}]",
+        items=(List[slim_model(StatusCheck, fields)], ...),
+        next_cursor=(Optional[str], None),
+    )
+    return TypeAdapter(page)
+
+CONTACT_FIELD_PRESETS = [
+    ("id", "name", "subject", "timestamp"),
+    ("id", "name", "email", "subject", "timestamp"),
+]
+STATUS_FIELD_PRESETS = [("client_name", "timestamp")]
+for preset in CONTACT_FIELD_PRESETS:
+    contact_list_adapter(preset)
+for preset in STATUS_FIELD_PRESETS:
+    status_page_adapter(preset)
+
+# Catalog Models (shapes match menuData, offersData and testimonialsData in
+# frontend/src/mock.js)
+class MenuItem(BaseModel):
+    id: int
+    name: str
+    description: str
+    price: float
+    image: str
+
+class MenuCategory(BaseModel):
+    id: int
+    name: str
+    items: List[MenuItem]
+
+class Menu(BaseModel):
+    categories: List[MenuCategory]
+
+class Offer(BaseModel):
+    id: int
+    title: str
+    description: str
+    validUntil: str
+    discount: str
+    type: str
+    image: str
+
+class Testimonial(BaseModel):
+    id: int
+    name: str
+    role: str
+    content: str
+    rating: int = Field(..., ge=1, le=5)
+    image: str
+
+# Order Models. Money is Decimal end to end: it is serialized as a string in
+# JSON and stored as Decimal128 in Mongo.
+class OrderLineCreate(BaseModel):
+    item_id: int
+    quantity: int = Field(..., ge=1, le=100)
+
+class OrderCreate(BaseModel):
+    items: List[OrderLineCreate] = Field(..., min_length=1, max_length=50)
+    customer_name: Optional[str] = Field(None, max_length=100)
+    notes: Optional[str] = Field(None, max_length=500)
+
+class OrderLine(BaseModel):
+    item_id: int
+    name: str
+    unit_price: Decimal
+    quantity: int
+    line_total: Decimal
+
+class Order(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    items: List[OrderLine]
+    total: Decimal
+    customer_name: Optional[str] = None
+    notes: Optional[str] = None
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class BulkOrderError(BaseModel):
+    index: int
+    detail: str
+
+class BulkOrderResult(BaseModel):
+    orders: List[Order]
+    errors: List[BulkOrderError]
+
+class WriteBehindBuffer:
+    """Collects documents in memory and writes them with insert_many.
+
+    A batch is flushed when it reaches ``max_batch`` documents or when
+    ``flush_interval`` seconds have passed since its first document arrived.
+    ``put`` blocks once ``max_pending`` documents are waiting, which pushes
+    back on callers instead of growing without bound. ``on_inserted``, if
+    given, is awaited with the documents of each batch that were written.
+    """
+
+    def __init__(self, collection, max_batch: int, flush_interval: float, max_pending: int,
+                 on_inserted=None):
+        self.collection = collection
+        self.on_inserted = on_inserted
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._closing = False
+        self._task = None
+        self.stats = {
+            "flushes": 0,
+            "documents": 0,
+            "failed_documents": 0,
+            "max_batch_size": 0,
+            "flush_seconds_total": 0.0,
+            "flush_seconds_max": 0.0,
+        }
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, document: dict):
+        if self._closing:
+            raise RuntimeError("Write-behind buffer is closed")
+        await self._queue.put(document)
+
+    async def close(self):
+        """Stop accepting documents and flush everything still buffered"""
+        self._closing = True
+        if self._task:
+            await self._task
+        logger.info(f"Write-behind buffer for {self.collection.name} closed: {self.snapshot()}")
+
+    def snapshot(self) -> dict:
+        flushes = self.stats["flushes"]
+        return {
+            **self.stats,
+            "pending": self._queue.qsize(),
+            "mean_batch_size": self.stats["documents"] / flushes if flushes else 0.0,
+            "mean_flush_seconds": self.stats["flush_seconds_total"] / flushes if flushes else 0.0,
+        }
+
+    async def _run(self):
+        while not (self._closing and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            # Wake up periodically even when idle so close() is noticed
+            batch.append(await asyncio.wait_for(self._queue.get(), self.flush_interval))
+        except asyncio.TimeoutError:
+            return batch
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self._closing:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: list):
+        started = time.perf_counter()
+        inserted = batch
+        error = None
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # With ordered=False the rest of the batch is still attempted;
+            # writeErrors tells us which documents did not make it
+            failed = {write_error["index"] for write_error in e.details.get("writeErrors", [])}
+            inserted = [doc for i, doc in enumerate(batch) if i not in failed]
+            error = e
+        except Exception as e:
+            # A command-level failure (e.g. NotPrimaryError during a
+            # failover) says nothing about individual documents
+            inserted = []
+            error = e
+        if error is not None:
+            lost = len(batch) - len(inserted)
+            self.stats["failed_documents"] += lost
+            # Callers were already told these documents were stored
+            logger.error(
+                f"Write-behind flush to {self.collection.name} lost {lost} of {len(batch)} "
+                f"acknowledged documents: {str(error)}"
+            )
+        if inserted and self.on_inserted is not None:
+            try:
+                await self.on_inserted(inserted)
+            except Exception as e:
+                logger.error(f"Write-behind on_inserted hook for {self.collection.name} failed: {str(e)}")
+        elapsed = time.perf_counter() - started
+        self.stats["flushes"] += 1
+        self.stats["documents"] += len(batch)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+        self.stats["flush_seconds_total"] += elapsed
+        self.stats["flush_seconds_max"] = max(self.stats["flush_seconds_max"], elapsed)
+
+status_write_buffer: Optional[WriteBehindBuffer] = None
+
+class SMTPConnection:
+    """A lazily opened SMTP session that is reused across messages.
+
+    Only ever used from one worker at a time, inside a thread, since
+    smtplib blocks.
+    """
+
+    def __init__(self):
+        self._smtp = None
+
+    def _connect(self) -> "smtplib.SMTP":
+        import smtplib
+
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_STARTTLS:
+            smtp.starttls()
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD or "")
+        return smtp
+
+    def send(self, message: "MIMEMultipart"):
+        import smtplib
+
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+            except smtplib.SMTPException:
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        self._smtp.send_message(message)
+
+    def close(self):
+        import smtplib
+
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+class EmailOutbox:
+    """Durable email queue drained by a pool of background workers.
+
+    Messages are written to Mongo first, so nothing is lost if the process
+    dies before sending. A worker claims a batch by moving each message to
+    ``sending`` with a lease in ``next_attempt_at``; if the worker dies the
+    lease runs out and another worker picks the message up again. Failed
+    sends are retried with exponential backoff up to ``max_attempts``; a
+    worker that hits a database error backs off the same way and carries on.
+    """
+
+    LEASE = timedelta(minutes=5)
+    MAX_ERROR_BACKOFF = 60.0
+
+    def __init__(self, collection, workers: int, batch_size: int, max_attempts: int,
+                 retry_base: float, poll_interval: float):
+        self.collection = collection
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._tasks: List[asyncio.Task] = []
+
+    async def enqueue(self, to: str, subject: str, body: str, reply_to: Optional[str] = None):
+        now = datetime.utcnow()
+        await self.collection.insert_one({
+            "id": str(uuid.uuid4()),
+            "to": to,
+            "subject": subject,
+            "body": body,
+            "reply_to": reply_to,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+        })
+        self._wakeup.set()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Let workers finish the batch they are sending, then stop"""
+        self._closing = True
+        self._wakeup.set()
+        await asyncio.gather(*self._tasks)
+
+    async def _idle(self, timeout: float):
+        """Sleep until timeout, an enqueue or close"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self):
+        connection = SMTPConnection()
+        errors = 0
+        try:
+            while not self._closing:
+                # Clear before claiming so an enqueue during the claim still
+                # wakes us up
+                self._wakeup.clear()
+                try:
+                    batch = await self._claim_batch()
+                    if batch:
+                        results = await asyncio.to_thread(self._send_batch, connection, batch)
+                        await self._record_results(batch, results)
+                    errors = 0
+                except Exception as e:
+                    # Usually Mongo being briefly unavailable; messages whose
+                    # results were not recorded are retried once their lease
+                    # runs out
+                    errors += 1
+                    delay = min(self.retry_base * 2 ** (errors - 1), self.MAX_ERROR_BACKOFF)
+                    logger.error(f"Email outbox worker error, retrying in {delay:.0f}s: {str(e)}")
+                    await self._idle(delay)
+                    continue
+                if not batch:
+                    await self._idle(self.poll_interval)
+        finally:
+            await asyncio.to_thread(connection.close)
+
+    async def _claim_batch(self) -> list:
+        batch = []
+        while len(batch) < self.batch_size:
+            now = datetime.utcnow()
+            message = await self.collection.find_one_and_update(
+                {"status": {"$in": ["pending", "sending"]}, "next_attempt_at": {"$lte": now}},
+                {"$set": {"status": "sending", "next_attempt_at": now + self.LEASE}},
+                sort=[("next_attempt_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if message is None:
+                break
+            batch.append(message)
+        return batch
+
+    @staticmethod
+    def _send_batch(connection: SMTPConnection, batch: list) -> List[Optional[str]]:
+        """Send every message over one connection; runs in a worker thread"""
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        results = []
+        for message in batch:
+            mime = MIMEMultipart()
+            mime["From"] = CONTACT_NOTIFY_FROM
+            mime["To"] = message["to"]
+            mime["Subject"] = message["subject"]
+            if message.get("reply_to"):
+                mime["Reply-To"] = message["reply_to"]
+            mime.attach(MIMEText(message["body"], "plain", "utf-8"))
+            try:
+                connection.send(mime)
+                results.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                # Drop the session so the next message reconnects
+                connection.close()
+                results.append(str(e))
+        return results
+
+    async def _record_results(self, batch: list, results: List[Optional[str]]):
+        now = datetime.utcnow()
+        updates = []
+        for message, error in zip(batch, results):
+            if error is None:
+                update = {"$set": {"status": "sent", "sent_at": now}}
+            else:
+                attempts = message["attempts"] + 1
+                if attempts >= self.max_attempts:
+                    status, next_attempt_at = "failed", now
+                    logger.error(f"Giving up on email {message['id']} after {attempts} attempts: {error}")
+                else:
+                    status = "pending"
+                    next_attempt_at = now + timedelta(seconds=self.retry_base * 2 ** (attempts - 1))
+                update = {"$set": {
+                    "status": status,
+                    "attempts": attempts,
+                    "last_error": error,
+                    "next_attempt_at": next_attempt_at,
+                }}
+            updates.append(UpdateOne({"_id": message["_id"]}, update))
+        await self.collection.bulk_write(updates, ordered=False)
+
+email_outbox: Optional[EmailOutbox] = None
+
+class TokenBucketLimiter:
+    """One token bucket per key, kept in a bounded LRU map.
+
+    Buckets are refilled lazily on access, so there is no background work;
+    when more than ``max_keys`` keys are tracked the least recently seen
+    one is evicted, which at worst hands that client a fresh bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: float, max_keys: int):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str, now: float) -> float:
+        """Take a token for key. Returns 0 on success, otherwise the number of
+        seconds until a token will be available."""
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+class DuplicateFilter:
+    """Remembers content fingerprints for ``window`` seconds.
+
+    Entries are inserted in time order, so expired ones are always at the
+    front of the map and are dropped from there on each check.
+    """
+
+    def __init__(self, window: float, max_keys: int):
+        self.window = window
+        self.max_keys = max_keys
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def check(self, key: str, now: float) -> float:
+        """Record key. Returns 0 if it is new, otherwise the seconds left until
+        the earlier copy expires."""
+        while self._seen:
+            oldest, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.window and len(self._seen) < self.max_keys:
+                break
+            self._seen.popitem(last=False)
+        seen_at = self._seen.get(key)
+        if seen_at is not None:
+            return self.window - (now - seen_at)
+        self._seen[key] = now
+        return 0.0
+
+    def forget(self, key: str):
+        self._seen.pop(key, None)
+
+contact_ip_limiter = TokenBucketLimiter(CONTACT_IP_RATE, CONTACT_IP_BURST, RATE_LIMIT_MAX_KEYS)
+contact_email_limiter = TokenBucketLimiter(CONTACT_EMAIL_RATE, CONTACT_EMAIL_BURST, RATE_LIMIT_MAX_KEYS)
+contact_duplicates = DuplicateFilter(CONTACT_DUPLICATE_WINDOW, RATE_LIMIT_MAX_KEYS)
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# The name create_indexes gave this index before it was managed by
+# ensure_ttl_index, so existing deployments retune it rather than clash
+IDEMPOTENCY_TTL_INDEX_NAME = "created_at_1"
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+
+class IdempotencyStore:
+    """Runs each (scope, Idempotency-Key) at most once and replays its response.
+
+    Lookups go to an in-process LRU first, then to the idempotency_keys
+    collection, where a document claims the key (its _id is unique) before
+    the write happens and then records the response body. Concurrent
+    requests for the same key in this process share one task; in other
+    processes they find the claim and wait for the recorded response. A
+    failed request releases its claim so the client can retry.
+    """
+
+    def __init__(self, collection, cache_size: int):
+        self.collection = collection
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def run(self, scope: str, key: str, payload: BaseModel, action) -> Response:
+        if not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(
+                status_code=400, detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+            )
+        record_id = f"{scope}:{key}"
+        fingerprint = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+        cached = self._cache.get(record_id)
+        if cached is not None:
+            self._cache.move_to_end(record_id)
+            return self._replay(cached, fingerprint)
+        task = self._inflight.get(record_id)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(record_id, fingerprint, action))
+            self._inflight[record_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(record_id, None))
+            owner_fingerprint, body, replayed = await asyncio.shield(task)
+        else:
+            # Another request with this key is running here; share its result
+            owner_fingerprint, body, _ = await asyncio.shield(task)
+            replayed = True
+        if replayed:
+            return self._replay((owner_fingerprint, body), fingerprint)
+        return Response(content=body, media_type="application/json")
+
+    def _replay(self, record: Tuple[str, bytes], fingerprint: str) -> Response:
+        stored_fingerprint, body = record
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used for a different request"
+            )
+        return Response(content=body, media_type="application/json", headers={"Idempotent-Replayed": "true"})
+
+    def _remember(self, record_id: str, fingerprint: str, body: bytes):
+        self._cache[record_id] = (fingerprint, body)
+        self._cache.move_to_end(record_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _execute(self, record_id: str, fingerprint: str, action) -> Tuple[str, bytes, bool]:
+        """Claim the key and run the action, or return the response recorded
+        under it. The flag says whether the response is a replay."""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT
+        while True:
+            now = datetime.utcnow()
+            try:
+                await self.collection.insert_one({
+                    "_id": record_id, "fingerprint": fingerprint, "status": "pending", "created_at": now,
+                })
+                break
+            except DuplicateKeyError:
+                pass
+            record = await self.collection.find_one({"_id": record_id})
+            if record is None:
+                continue  # released by a failed attempt in the meantime
+            if record["status"] == "done":
+                body = bytes(record["body"])
+                self._remember(record_id, record["fingerprint"], body)
+                return record["fingerprint"], body, True
+            # Take over a claim whose worker has evidently died
+            taken = await self.collection.find_one_and_update(
+                {"_id": record_id, "status": "pending",
+                 "created_at": {"$lt": now - timedelta(seconds=IDEMPOTENCY_LEASE)}},
+                {"$set": {"fingerprint": fingerprint, "created_at": now}},
+            )
+            if taken is not None:
+                break
+            if time.monotonic() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+        try:
+            result = await action()
+        except BaseException:
+            await self.collection.delete_one({"_id": record_id, "status": "pending"})
+            raise
+        body = result.model_dump_json().encode()
+        try:
+            await self.collection.update_one(
+                {"_id": record_id}, {"$set": {"status": "done", "body": body}}
+            )
+        except Exception as e:
+            # The write itself succeeded; a retry in another worker may repeat it
+            logger.error(f"Error recording idempotent response for {record_id}: {str(e)}")
+        self._remember(record_id, fingerprint, body)
+        return fingerprint, body, False
+
+idempotency_store: Optional[IdempotencyStore] = None
+
+class FanoutHub:
+    """In-process pub/sub: every published event goes to every subscriber.
+
+    Events are encoded once by the publisher and handed out as bytes, so a
+    publish costs one put_nowait per subscriber and an idle subscriber costs
+    only its waiting task. A subscriber whose queue is full is cut off (its
+    queue is replaced by a single DROPPED marker) instead of slowing the
+    publisher or growing without bound.
+
+    Only submissions handled by this process are seen; with several
+    workers, each dashboard sees the worker it is connected to.
+    """
+
+    DROPPED = object()
+    CLOSED = object()
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: set = set()
+        self.dropped = 0
+        self.closed = False
+
+    def subscribe(self) -> asyncio.Queue:
+        if self.closed:
+            raise HTTPException(status_code=503, detail="Server is shutting down")
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HTTPException(status_code=503, detail="Too many live subscribers")
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _replace_contents(self, queue: asyncio.Queue, marker):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(marker)
+
+    def publish(self, event: bytes):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                self._replace_contents(queue, self.DROPPED)
+                self.dropped += 1
+
+    def close(self):
+        """End every open stream and refuse new ones, e.g. at shutdown"""
+        self.closed = True
+        for queue in self._subscribers:
+            self._replace_contents(queue, self.CLOSED)
+        self._subscribers.clear()
+
+contact_hub: Optional[FanoutHub] = None
+
+def close_streams_on_exit():
+    """End open event streams as soon as uvicorn is told to exit.
+
+    uvicorn (also under gunicorn's UvicornWorker) runs lifespan shutdown
+    only once every connection has closed, so closing the hub there waits
+    on the very streams it should end, until gunicorn kills the worker and
+    the shutdown flushes are lost. Like sse-starlette, wrap
+    Server.handle_exit instead; this has to happen before the server
+    installs its signal handlers, which it does after importing the app.
+
+    This leans on uvicorn internals (the handle_exit(sig, frame) method and
+    the order of startup in Server.serve, as of the pinned uvicorn 0.25), so
+    recheck it when upgrading uvicorn. It is only installed when the process
+    is a uvicorn server, i.e. uvicorn.server is already imported: the
+    uvicorn CLI, uvicorn.run and gunicorn's UvicornWorker all import it
+    before the app. Importing the app anywhere else patches nothing.
+    """
+    Server = getattr(sys.modules.get("uvicorn.server"), "Server", None)
+    if Server is None:
+        return
+
+    handle_exit = Server.handle_exit
+    if getattr(handle_exit, "closes_streams", False):
+        return
+
+    @functools.wraps(handle_exit)
+    def wrapper(self, sig, frame):
+        if contact_hub is not None:
+            contact_hub.close()
+        handle_exit(self, sig, frame)
+
+    wrapper.closes_streams = True
+    Server.handle_exit = wrapper
+
+close_streams_on_exit()
+
+def require_admin(request: Request):
+    """Dependency for operator-only endpoints"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required",
+                            headers={"WWW-Authenticate": "Bearer"})
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
+async def create_status_check(input: StatusCheckCreate, request: Request):
+    key = request.headers.get("idempotency-key")
+    if key is not None and idempotency_store is not None:
+        return await idempotency_store.run("status", key, input, lambda: store_status_check(input))
+    return await store_status_check(input)
+
+async def store_status_check(input: StatusCheckCreate) -> StatusCheck:
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    if status_write_buffer is not None:
+        with span("buffer"):
+            await status_write_buffer.put(status_obj.dict())
+    else:
+        with span("db"):
+            _ = await db.status_checks.insert_one(status_obj.dict())
+        with span("rollups"):
+            await apply_rollups(status_rollup_keys, [status_obj.dict()])
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.get("/status/write-behind")
+async def get_status_write_behind_stats():
+    """Batch size and flush latency counters for the status write-behind buffer"""
+    if status_write_buffer is None:
+        return {"enabled": False}
+    return {"enabled": True, **status_write_buffer.snapshot()}
+
+# Status checks are paged by (timestamp, id) so every page is a bounded range
+# scan on the compound index instead of a skip over the whole collection.
+STATUS_PAGE_DEFAULT = 100
+STATUS_PAGE_MAX = 1000
+
+def encode_status_cursor(doc: dict) -> str:
+    """Build an opaque cursor pointing just after the given document"""
+    raw = json.dumps([doc["timestamp"].isoformat(), doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_status_cursor(cursor: str) -> dict:
+    """Turn a cursor back into a Mongo filter for the next page"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = datetime.fromisoformat(timestamp)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # The top-level $gte gives the planner a tight lower bound on the index
+    return {
+        "timestamp": {"$gte": timestamp},
+        "$or": [
+            {"timestamp": {"$gt": timestamp}},
+            {"id": {"$gt": last_id}},
+        ],
+    }
+
+def status_checks_page(collection, query: dict, limit: int, projection: dict = STATUS_CHECK_PROJECTION):
+    """Cursor for one page of status checks plus one lookahead document"""
+    return collection.find(query, projection).sort(
+        [("timestamp", ASCENDING), ("id", ASCENDING)]
+    ).limit(limit + 1)
+
+@api_router.get("/status", response_model=StatusCheckPage)
+async def get_status_checks(
+    after: Optional[str] = None,
+    limit: int = Query(STATUS_PAGE_DEFAULT, ge=1, le=STATUS_PAGE_MAX),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. client_name,timestamp"),
+):
+    query = decode_status_cursor(after) if after else {}
+    selected = parse_fields(fields, StatusCheck)
+    adapter, projection = STATUS_PAGE_ADAPTER, STATUS_CHECK_PROJECTION
+    if selected is not None:
+        adapter = status_page_adapter(selected)
+        # The cursor is built from timestamp and id, so always read those
+        projection = fields_projection(selected + ("timestamp", "id"))
+    # Fetch one extra document to know whether another page exists
+    with span("db"):
+        status_checks = await status_checks_page(db.status_checks, query, limit, projection).to_list(limit + 1)
+    next_cursor = None
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        next_cursor = encode_status_cursor(status_checks[-1])
+    return model_json_response(adapter, {"items": status_checks, "next_cursor": next_cursor})
+
+# Status Check Archive
+# One Parquet file per UTC day, written in row groups of
+# STATUS_ARCHIVE_CHUNK_SIZE sorted by timestamp. Reads only open the days in
+# range and skip row groups by their timestamp statistics.
+STATUS_ARCHIVE_QUERY_MAX_DAYS = 366
+STATUS_TTL_INDEX_NAME = "status_checks_ttl"
+
+def naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC; bring query bounds into line"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def day_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+def status_archive_path(day: datetime) -> Path:
+    return STATUS_ARCHIVE_DIR / f"date={rollup_day(day)}" / "status_checks.parquet"
+
+async def ensure_status_retention(database):
+    """Create, retune or drop the TTL index to match STATUS_RETENTION_DAYS"""
+    if STATUS_RETENTION_DAYS <= 0:
+        if STATUS_TTL_INDEX_NAME in await database.status_checks.index_information():
+            await database.status_checks.drop_index(STATUS_TTL_INDEX_NAME)
+            logger.info("Status check retention disabled, TTL index dropped")
+        return
+    if STATUS_ARCHIVE_AFTER_DAYS >= STATUS_RETENTION_DAYS:
+        logger.warning(
+            f"STATUS_ARCHIVE_AFTER_DAYS ({STATUS_ARCHIVE_AFTER_DAYS}) is not below STATUS_RETENTION_DAYS "
+            f"({STATUS_RETENTION_DAYS}); status checks will expire before they are archived"
+        )
+    await ensure_ttl_index(
+        database.status_checks, STATUS_TTL_INDEX_NAME, "timestamp", STATUS_RETENTION_DAYS * 86400
+    )
+    logger.info(f"Status checks expire after {STATUS_RETENTION_DAYS} days")
+
+def write_status_chunk(writer, path: Path, chunk: list):
+    """Append one row group to the day's Parquet file, opening it on first use"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "id": pa.array([doc["id"] for doc in chunk], pa.string()),
+        "client_name": pa.array([doc["client_name"] for doc in chunk], pa.string()),
+        "timestamp": pa.array([doc["timestamp"] for doc in chunk], pa.timestamp("ms")),
+    })
+    if writer is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+    writer.write_table(table)
+    return writer
+
+async def archive_status_day(database, day: datetime) -> int:
+    """Stream one day of status checks into its Parquet file"""
+    path = status_archive_path(day)
+    temporary = path.with_name(path.name + ".tmp")
+    cursor = database.status_checks.find(
+        {"timestamp": {"$gte": day, "$lt": day + timedelta(days=1)}}, STATUS_CHECK_PROJECTION
+    ).sort([("timestamp", ASCENDING), ("id", ASCENDING)]).batch_size(STATUS_ARCHIVE_CHUNK_SIZE)
+    writer, chunk, rows = None, [], 0
+    try:
+        async for doc in cursor:
+            chunk.append(doc)
+            if len(chunk) >= STATUS_ARCHIVE_CHUNK_SIZE:
+                writer = await asyncio.to_thread(write_status_chunk, writer, temporary, chunk)
+                rows += len(chunk)
+                chunk = []
+        if chunk:
+            writer = await asyncio.to_thread(write_status_chunk, writer, temporary, chunk)
+            rows += len(chunk)
+        if writer is not None:
+            await asyncio.to_thread(writer.close)
+            os.replace(temporary, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        temporary.unlink(missing_ok=True)
+        raise
+    finally:
+        await cursor.close()
+    return rows
+
+async def archive_status_checks(database) -> dict:
+    """Archive every complete day older than STATUS_ARCHIVE_AFTER_DAYS that
+    has no Parquet file yet. Safe to rerun; finished days are skipped."""
+    cutoff = day_start(datetime.utcnow()) - timedelta(days=STATUS_ARCHIVE_AFTER_DAYS)
+    oldest = await database.status_checks.find_one(
+        {"timestamp": {"$lt": cutoff}}, {"_id": 0, "timestamp": 1}, sort=[("timestamp", ASCENDING)]
+    )
+    summary = {"days": 0, "documents": 0}
+    day = day_start(oldest["timestamp"]) if oldest else cutoff
+    while day < cutoff:
+        if not status_archive_path(day).exists():
+            rows = await archive_status_day(database, day)
+            if rows:
+                summary["days"] += 1
+                summary["documents"] += rows
+                logger.info(f"Archived {rows} status checks for {rollup_day(day)}")
+        day += timedelta(days=1)
+    return summary
+
+def iter_archived_status_chunks(since: datetime, until: datetime, client_name: Optional[str],
+                                limit: Optional[int]):
+    """Yield NDJSON chunks of archived status checks in [since, until)"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    files, day = [], day_start(since)
+    while day < until:
+        path = status_archive_path(day)
+        if path.exists():
+            files.append(str(path))
+        day += timedelta(days=1)
+    if not files:
+        return
+    timestamp = ds.field("timestamp")
+    condition = (timestamp >= pa.scalar(since, pa.timestamp("ms"))) & (timestamp < pa.scalar(until, pa.timestamp("ms")))
+    if client_name is not None:
+        condition &= ds.field("client_name") == client_name
+    remaining = limit
+    for batch in ds.dataset(files, format="parquet").to_batches(filter=condition):
+        rows = batch.to_pylist()
+        if remaining is not None:
+            rows = rows[:remaining]
+            remaining -= len(rows)
+        if rows:
+            yield "".join(
+                json.dumps({**row, "timestamp": row["timestamp"].isoformat()}) + "\n" for row in rows
+            )
+        if remaining == 0:
+            return
+
+async def iter_archived_status_ndjson(*args):
+    """Pull archive chunks in a worker thread so Parquet decoding stays off the loop"""
+    chunks = iter_archived_status_chunks(*args)
+    try:
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            yield chunk
+    except Exception as e:
+        logger.error(f"Error reading status check archive: {str(e)}")
+
+@api_router.get("/status/archive")
+async def get_archived_status_checks(
+    since: datetime,
+    until: datetime,
+    client_name: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Stream archived status checks in [since, until) as NDJSON, oldest first"""
+    since, until = naive_utc(since), naive_utc(until)
+    if until <= since:
+        raise HTTPException(status_code=400, detail="until must be after since")
+    if until - since > timedelta(days=STATUS_ARCHIVE_QUERY_MAX_DAYS):
+        raise HTTPException(
+            status_code=400, detail=f"At most {STATUS_ARCHIVE_QUERY_MAX_DAYS} days can be read at once"
+        )
+    return StreamingResponse(
+        iter_archived_status_ndjson(since, until, client_name, limit),
+        media_type="application/x-ndjson",
+    )
+
+def contact_notification_body(contact: ContactSubmission) -> str:
+    return (
+        f"New contact form submission\n\n"
+        f"Name: {contact.name}\n"
+        f"Email: {contact.email}\n"
+        f"Phone: {contact.phone or '-'}\n"
+        f"Subject: {contact.subject}\n"
+        f"Received: {contact.timestamp.isoformat()}Z\n\n"
+        f"{contact.message}\n"
+    )
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def contact_fingerprint(contact_data: ContactSubmissionCreate) -> str:
+    """Hash of the content, ignoring case and whitespace differences"""
+    normalized = "\x00".join(
+        " ".join(value.lower().split())
+        for value in (contact_data.email, contact_data.subject, contact_data.message)
+    )
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+def too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+def check_contact_limits(contact_data: ContactSubmissionCreate, request: Request) -> Optional[str]:
+    """Raise 429 if the submission is over a rate limit or a recent duplicate.
+    Returns the fingerprint recorded for the duplicate check."""
+    if not CONTACT_RATE_LIMIT:
+        return None
+    now = time.monotonic()
+    wait = contact_ip_limiter.acquire(client_ip(request), now)
+    if wait:
+        raise too_many_requests("Too many submissions, please try again later", wait)
+    wait = contact_email_limiter.acquire(contact_data.email.lower(), now)
+    if wait:
+        raise too_many_requests("Too many submissions from this email address", wait)
+    fingerprint = contact_fingerprint(contact_data)
+    wait = contact_duplicates.check(fingerprint, now)
+    if wait:
+        raise too_many_requests("This message was already received", wait)
+    return fingerprint
 
 # Contact Form Endpoint
 @api_router.post("/contact", response_model=ContactSubmission)
-async def submit_contact_form(contact_data: ContactSubmissionCreate):
+async def submit_contact_form(contact_data: ContactSubmissionCreate, request: Request):
+    # A retry carrying the same key gets the original response, ahead of the
+    # rate limits and duplicate filter that would otherwise reject it
+    key = request.headers.get("idempotency-key")
+    if key is not None and idempotency_store is not None:
+        return await idempotency_store.run(
+            "contact", key, contact_data, lambda: store_contact_submission(contact_data, request)
+        )
+    return await store_contact_submission(contact_data, request)
+
+async def store_contact_submission(contact_data: ContactSubmissionCreate, request: Request) -> ContactSubmission:
+    with span("limits"):
+        fingerprint = check_contact_limits(contact_data, request)
     try:
         # Create contact submission object
         contact_dict = contact_data.dict()
         contact_obj = ContactSubmission(**contact_dict)
         
         # Store in MongoDB
-        _ = await db.contact_submissions.insert_one(contact_obj.dict())
+        with span("db"):
+            _ = await db.contact_submissions.insert_one(contact_obj.dict())
+        with span("rollups"):
+            await apply_rollups(contact_rollup_keys, [contact_obj.dict()])
+        
+        # Queue the email notification; the outbox workers send it. The
+        # submission is already stored, so a failure here must not turn into
+        # an error the client would retry
+        if email_outbox is not None:
+            with span("outbox"):
+                try:
+                    await email_outbox.enqueue(
+                        to=CONTACT_NOTIFY_TO,
+                        subject=f"[Contact] {contact_obj.subject}",
+                        body=contact_notification_body(contact_obj),
+                        reply_to=contact_obj.email,
+                    )
+                except Exception as e:
+                    logger.error(f"Error queueing notification for contact {contact_obj.id}: {str(e)}")
         
-        # Send email notification (for now, just log - will implement email later)
-        logger.info(f"New contact form submission from {contact_obj.name} ({contact_obj.email})")
-        logger.info(f"Subject: {contact_obj.subject}")
-        logger.info(f"Message: {contact_obj.message}")
+        if contact_hub is not None:
+            with span("publish"):
+                contact_hub.publish(contact_event(contact_obj))
+        
+        with span("log"):
+            logger.info("New contact form submission", extra={
+                "contact_id": contact_obj.id,
+                "contact_name": contact_obj.name,
+                "contact_email": contact_obj.email,
+                "contact_subject": contact_obj.subject,
+                "contact_message": contact_obj.message,
+            })
         
         return contact_obj
     except Exception as e:
+        # Let the client resend a submission that was never stored
+        if fingerprint:
+            contact_duplicates.forget(fingerprint)
         logger.error(f"Error processing contact form: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to process contact form submission")
 
+CONTACT_LIST_LIMIT = 100
+
+def recent_contact_submissions(collection, projection: dict = CONTACT_SUBMISSION_PROJECTION):
+    """Cursor for the newest contact submissions shown in the admin list"""
+    return collection.find({}, projection).sort(
+        "timestamp", DESCENDING
+    ).limit(CONTACT_LIST_LIMIT)
+
 @api_router.get("/contact", response_model=List[ContactSubmission])
-async def get_contact_submissions():
+async def get_contact_submissions(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,subject,timestamp"),
+):
     """Get all contact submissions (admin endpoint)"""
+    selected = parse_fields(fields, StoredContactSubmission)
+    adapter, projection = CONTACT_LIST_ADAPTER, CONTACT_SUBMISSION_PROJECTION
+    if selected is not None:
+        adapter, projection = contact_list_adapter(selected), fields_projection(selected)
     try:
-        submissions = await db.contact_submissions.find().sort("timestamp", -1).to_list(100)
-        return [ContactSubmission(**submission) for submission in submissions]
+        with span("db"):
+            submissions = await recent_contact_submissions(db.contact_submissions, projection).to_list(CONTACT_LIST_LIMIT)
+        return model_json_response(adapter, submissions)
     except Exception as e:
         logger.error(f"Error fetching contact submissions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch contact submissions")
 
-# Include the router in the main app
-app.include_router(api_router)
+# Export reads the cursor in batches of this size, so memory stays flat
+# regardless of how many submissions are streamed out
+CONTACT_EXPORT_BATCH_SIZE = 500
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def contact_export_cursor(collection, query: dict):
+    """Cursor over contact submissions in export order"""
+    return collection.find(query, CONTACT_SUBMISSION_PROJECTION).sort("timestamp", ASCENDING).batch_size(
+        CONTACT_EXPORT_BATCH_SIZE
+    )
+
+async def iter_contact_ndjson(query: dict):
+    """Yield contact submissions as NDJSON straight off the Mongo cursor, one
+    chunk per cursor batch so each send (and compressor flush) carries many
+    rows"""
+    cursor = contact_export_cursor(db.contact_submissions, query)
+    try:
+        while submissions := await cursor.to_list(CONTACT_EXPORT_BATCH_SIZE):
+            yield "".join(
+                StoredContactSubmission.model_validate(submission).model_dump_json() + "\n"
+                for submission in submissions
+            )
+    except Exception as e:
+        # Headers are already sent at this point, so the best we can do is
+        # log and cut the stream short
+        logger.error(f"Error exporting contact submissions: {str(e)}")
+    finally:
+        await cursor.close()
+
+@api_router.get("/contact/export", dependencies=[Depends(require_admin)])
+async def export_contact_submissions(since: Optional[datetime] = None):
+    """Stream contact submissions as NDJSON, oldest first (admin endpoint)"""
+    query = {"timestamp": {"$gte": since}} if since else {}
+    return StreamingResponse(
+        iter_contact_ndjson(query),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="contact_submissions.ndjson"'},
+    )
+
+# Live Contact Feed
+def sse_event(event: str, data: str, event_id: Optional[str] = None) -> bytes:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return ("\n".join(lines) + "\n\n").encode()
+
+def contact_event(contact: ContactSubmission) -> bytes:
+    return sse_event("contact", contact.model_dump_json(), contact.id)
+
+SSE_HEARTBEAT = b": heartbeat\n\n"
+
+async def missed_contact_events(last_event_id: str) -> list:
+    """Submissions newer than the one a reconnecting client saw last"""
+    last = await db.contact_submissions.find_one({"id": last_event_id}, {"_id": 0, "timestamp": 1})
+    if last is None:
+        return []
+    documents = await db.contact_submissions.find(
+        {"timestamp": {"$gt": last["timestamp"]}}, CONTACT_SUBMISSION_PROJECTION
+    ).sort("timestamp", ASCENDING).limit(CONTACT_LIST_LIMIT).to_list(CONTACT_LIST_LIMIT)
+    return [StoredContactSubmission.model_validate(document) for document in documents]
+
+async def iter_contact_events(hub: FanoutHub, queue: asyncio.Queue, backlog: list):
+    try:
+        yield f"retry: {int(CONTACT_STREAM_HEARTBEAT * 1000)}\n\n".encode()
+        sent = set()
+        for submission in backlog:
+            sent.add(submission.id)
+            yield contact_event(submission)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), CONTACT_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield SSE_HEARTBEAT
+                continue
+            if event is FanoutHub.DROPPED:
+                yield sse_event("dropped", "Too far behind; reconnect to resume")
+                return
+            if event is FanoutHub.CLOSED:
+                return
+            if sent:
+                # The backlog query may have already returned events published
+                # while it ran; skip those once
+                event_id = event.split(b"\n", 1)[0][len(b"id: "):].decode()
+                if event_id in sent:
+                    sent.discard(event_id)
+                    continue
+            yield event
+    finally:
+        hub.unsubscribe(queue)
+
+@api_router.get("/contact/stream", dependencies=[Depends(require_admin)])
+async def stream_contact_submissions(request: Request):
+    """New contact submissions as Server-Sent Events (admin endpoint).
+
+    Reconnecting clients send Last-Event-ID and first receive what they
+    missed, up to CONTACT_LIST_LIMIT submissions. The admin token goes in
+    the Authorization header, so browsers need a fetch-based SSE client
+    rather than EventSource.
+    """
+    # Subscribe before reading the backlog so nothing falls in between
+    queue = contact_hub.subscribe()
+    backlog = []
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        try:
+            backlog = await missed_contact_events(last_event_id)
+        except Exception as e:
+            contact_hub.unsubscribe(queue)
+            logger.error(f"Error fetching missed contact submissions: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch contact submissions")
+    return StreamingResponse(
+        iter_contact_events(contact_hub, queue, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Relevance order needs every match scored and sorted, so search time is
+# bounded by capping how deep results can be paged (the sort only ever keeps
+# the top page * limit matches) and by a server-side time limit
+CONTACT_SEARCH_PAGE_DEFAULT = 20
+CONTACT_SEARCH_PAGE_MAX = 100
+CONTACT_SEARCH_MAX_RESULTS = 1000
+CONTACT_SEARCH_MAX_TIME_MS = int(os.environ.get('CONTACT_SEARCH_MAX_TIME_MS', '2000'))
+
+def contact_search_cursor(collection, query: dict, skip: int, limit: int):
+    """Cursor over text matches, best first and newest first among equals"""
+    score = {"$meta": "textScore"}
+    return collection.find(query, {**CONTACT_SUBMISSION_PROJECTION, "score": score}).sort(
+        [("score", score), ("timestamp", DESCENDING)]
+    ).skip(skip).limit(limit).max_time_ms(CONTACT_SEARCH_MAX_TIME_MS)
+
+@api_router.get("/contact/search", dependencies=[Depends(require_admin)], response_model=ContactSearchPage)
+async def search_contact_submissions(
+    q: str = Query(..., min_length=1, max_length=200),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(CONTACT_SEARCH_PAGE_DEFAULT, ge=1, le=CONTACT_SEARCH_PAGE_MAX),
+):
+    """Full-text search over name, email, subject and message (admin endpoint)"""
+    skip = (page - 1) * limit
+    if skip + limit > CONTACT_SEARCH_MAX_RESULTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Only the first {CONTACT_SEARCH_MAX_RESULTS} results can be paged; refine the search",
+        )
+    query = {"$text": {"$search": q}}
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    try:
+        # One extra row tells us whether there is a next page
+        hits = await contact_search_cursor(db.contact_submissions, query, skip, limit + 1).to_list(limit + 1)
+        has_more = len(hits) > limit and skip + limit < CONTACT_SEARCH_MAX_RESULTS
+        return model_json_response(
+            CONTACT_SEARCH_ADAPTER, {"items": hits[:limit], "next_page": page + 1 if has_more else None}
+        )
+    except ExecutionTimeout:
+        raise HTTPException(status_code=503, detail="Search took too long; refine the search")
+    except Exception as e:
+        logger.error(f"Error searching contact submissions: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search contact submissions")
+
+# Bulk Ingest
+# NDJSON bodies are read as they stream in, validated line by line and
+# written in insert_many(ordered=False) chunks, so memory stays bounded by the
+# chunk size however large the upload. A bad record only fails its own line.
+BULK_INGEST_CHUNK_SIZE = int(os.environ.get('BULK_INGEST_CHUNK_SIZE', '500'))
+BULK_INGEST_MAX_LINE_BYTES = 64 * 1024
+# Only this many errors are itemized in the response; failed counts them all
+BULK_INGEST_MAX_ERRORS = 1000
+
+def validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}"
+        for item in error.errors(include_url=False)
+    )
+
+async def iter_ndjson_lines(request: Request):
+    """Yield (line number, raw line) from a streamed body. Oversized lines
+    are yielded as None instead of being buffered whole."""
+    buffer, number, oversized = b"", 0, False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, None if oversized or len(line) > BULK_INGEST_MAX_LINE_BYTES else line
+            oversized = False
+        if len(buffer) > BULK_INGEST_MAX_LINE_BYTES:
+            buffer, oversized = b"", True
+    if buffer or oversized:
+        yield number + 1, None if oversized else buffer
+
+class BulkIngest:
+    """Validates NDJSON records and writes them to a collection in chunks"""
+
+    def __init__(self, collection, model, to_document, rollup_keys):
+        self.collection = collection
+        self.model = model
+        self.to_document = to_document
+        self.rollup_keys = rollup_keys
+        self.received = 0
+        self.inserted = 0
+        self.errors: List[BulkIngestError] = []
+        self.failed = 0
+        self._documents: list = []
+        self._lines: List[int] = []
+
+    def fail(self, line: int, detail: str):
+        self.failed += 1
+        if len(self.errors) < BULK_INGEST_MAX_ERRORS:
+            self.errors.append(BulkIngestError(line=line, detail=detail))
+
+    async def add(self, line: int, raw: Optional[bytes]):
+        if raw is not None and not raw.strip():
+            return
+        self.received += 1
+        if raw is None:
+            self.fail(line, f"Record longer than {BULK_INGEST_MAX_LINE_BYTES} bytes")
+            return
+        try:
+            record = self.model.model_validate_json(raw)
+        except ValidationError as e:
+            self.fail(line, validation_detail(e))
+            return
+        self._documents.append(self.to_document(record))
+        self._lines.append(line)
+        if len(self._documents) >= BULK_INGEST_CHUNK_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        documents, lines = self._documents, self._lines
+        self._documents, self._lines = [], []
+        if not documents:
+            return
+        failed = {}
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # ordered=False: everything not listed in writeErrors was stored
+            failed = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+            logger.error(f"Bulk insert into {self.collection.name} failed for {len(failed)} records: {str(e)}")
+        except Exception as e:
+            # A command-level error (e.g. NotPrimaryError) says nothing about
+            # individual records, so none of the chunk counts as stored
+            failed = {index: "Failed to store record" for index in range(len(documents))}
+            logger.error(f"Bulk insert into {self.collection.name} failed for {len(failed)} records: {str(e)}")
+        for index, detail in sorted(failed.items()):
+            self.fail(lines[index], detail)
+        stored = [doc for index, doc in enumerate(documents) if index not in failed]
+        self.inserted += len(stored)
+        if stored:
+            await apply_rollups(self.rollup_keys, stored)
+
+    def result(self) -> BulkIngestResult:
+        return BulkIngestResult(
+            received=self.received, inserted=self.inserted, failed=self.failed, errors=self.errors
+        )
+
+async def ingest_ndjson(request: Request, ingest: BulkIngest) -> BulkIngestResult:
+    async for line, raw in iter_ndjson_lines(request):
+        await ingest.add(line, raw)
+    await ingest.flush()
+    return ingest.result()
+
+def imported_document(model, record) -> dict:
+    """Build the stored document, keeping the record's own timestamp if it has one"""
+    data = record.dict()
+    timestamp = data.pop("timestamp")
+    document = model(**data).dict()
+    if timestamp is not None:
+        document["timestamp"] = naive_utc(timestamp)
+    return document
+
+@api_router.post("/status/bulk", response_model=BulkIngestResult)
+async def ingest_status_checks(request: Request):
+    """Store status checks from an NDJSON body, one StatusCheckCreate per line"""
+    ingest = BulkIngest(
+        db.status_checks, StatusCheckImport,
+        lambda record: imported_document(StatusCheck, record), status_rollup_keys,
+    )
+    return await ingest_ndjson(request, ingest)
+
+@api_router.post("/contact/bulk", dependencies=[Depends(require_admin)], response_model=BulkIngestResult)
+async def ingest_contact_submissions(request: Request):
+    """Store contact submissions from an NDJSON body (admin endpoint).
+
+    Meant for migrations and replays, so no rate limits apply and no
+    notification emails are sent; that is why it needs the admin token.
+    """
+    ingest = BulkIngest(
+        db.contact_submissions, ContactSubmissionImport,
+        lambda record: imported_document(ContactSubmission, record), contact_rollup_keys,
+    )
+    return await ingest_ndjson(request, ingest)
+
+# Analytics Rollups
+# Every insert bumps per-day counters in the rollups collection with an
+# atomic $inc, so /api/stats reads a few buckets per day instead of scanning
+# the raw collections. A bucket's _id is "metric|day|key"; day totals use an
+# empty key. backfill_rollups rebuilds them all from the raw collections.
+ROLLUP_KEY_MAX_LENGTH = 100
+STATS_DAYS_DEFAULT = 30
+STATS_DAYS_MAX = 366
+STATS_TOP_DEFAULT = 10
+
+def rollup_day(timestamp: datetime) -> str:
+    return timestamp.strftime("%Y-%m-%d")
+
+def rollup_key(value: str) -> str:
+    """Case- and whitespace-insensitive grouping key"""
+    return " ".join(value.lower().split())[:ROLLUP_KEY_MAX_LENGTH]
+
+def contact_rollup_keys(doc: dict) -> list:
+    day = rollup_day(doc["timestamp"])
+    return [("contact.daily", day, ""), ("contact.subject", day, rollup_key(doc["subject"]))]
+
+def status_rollup_keys(doc: dict) -> list:
+    day = rollup_day(doc["timestamp"])
+    return [("status.daily", day, ""), ("status.client", day, rollup_key(doc["client_name"]))]
+
+def rollup_bucket_id(metric: str, day: str, key: str) -> str:
+    return f"{metric}|{day}|{key}"
+
+def rollup_updates(counts: Counter) -> list:
+    return [
+        UpdateOne(
+            {"_id": rollup_bucket_id(metric, day, key)},
+            {"$inc": {"count": n}, "$setOnInsert": {"metric": metric, "day": day, "key": key}},
+            upsert=True,
+        )
+        for (metric, day, key), n in counts.items()
+    ]
+
+async def apply_rollups(keys_for, documents: list):
+    """Count freshly inserted documents into their buckets.
+
+    The insert has already succeeded at this point, so a failure here is
+    logged rather than failing the request; backfill_rollups repairs drift.
+    """
+    counts = Counter(key for doc in documents for key in keys_for(doc))
+    try:
+        await db.rollups.bulk_write(rollup_updates(counts), ordered=False)
+    except Exception as e:
+        logger.error(f"Error updating rollups: {str(e)}")
+
+async def backfill_rollups(database, batch_size: int = 1000) -> dict:
+    """Rebuild every rollup bucket from contact_submissions and status_checks.
+
+    Buckets are overwritten with $set and stale ones removed, so the result
+    does not depend on what was there before. Documents inserted while this
+    runs may be counted twice or not at all; run it again once quiet.
+    """
+    counts = Counter()
+    sources = [
+        (database.contact_submissions, {"_id": 0, "timestamp": 1, "subject": 1}, contact_rollup_keys),
+        (database.status_checks, {"_id": 0, "timestamp": 1, "client_name": 1}, status_rollup_keys),
+    ]
+    for collection, projection, keys_for in sources:
+        async for doc in collection.find({}, projection).batch_size(batch_size):
+            counts.update(keys_for(doc))
+    updates = [
+        UpdateOne(
+            {"_id": rollup_bucket_id(metric, day, key)},
+            {"$set": {"metric": metric, "day": day, "key": key, "count": n}},
+            upsert=True,
+        )
+        for (metric, day, key), n in counts.items()
+    ]
+    for start in range(0, len(updates), batch_size):
+        await database.rollups.bulk_write(updates[start:start + batch_size], ordered=False)
+    current = {rollup_bucket_id(*bucket) for bucket in counts}
+    stale = [doc["_id"] async for doc in database.rollups.find({}, {"_id": 1}) if doc["_id"] not in current]
+    for start in range(0, len(stale), batch_size):
+        await database.rollups.delete_many({"_id": {"$in": stale[start:start + batch_size]}})
+    return {"buckets": len(counts)}
+
+async def daily_counts(metric: str, days: List[str]) -> List[DailyCount]:
+    found = {
+        doc["day"]: doc["count"]
+        async for doc in db.rollups.find(
+            {"metric": metric, "day": {"$gte": days[0], "$lte": days[-1]}}, {"_id": 0, "day": 1, "count": 1}
+        )
+    }
+    return [DailyCount(day=day, count=found.get(day, 0)) for day in days]
+
+async def top_keys(metric: str, days: List[str], top: int) -> List[KeyCount]:
+    pipeline = [
+        {"$match": {"metric": metric, "day": {"$gte": days[0], "$lte": days[-1]}}},
+        {"$group": {"_id": "$key", "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": top},
+    ]
+    return [KeyCount(key=doc["_id"], count=doc["count"]) async for doc in db.rollups.aggregate(pipeline)]
+
+@api_router.get("/stats", response_model=Stats)
+async def get_stats(
+    days: int = Query(STATS_DAYS_DEFAULT, ge=1, le=STATS_DAYS_MAX),
+    top: int = Query(STATS_TOP_DEFAULT, ge=1, le=100),
+):
+    """Daily counts, top subjects and top clients for the last ``days`` days (UTC)"""
+    today = datetime.utcnow()
+    window = [rollup_day(today - timedelta(days=offset)) for offset in range(days - 1, -1, -1)]
+    try:
+        contact_daily, subjects, status_daily, clients = await asyncio.gather(
+            daily_counts("contact.daily", window),
+            top_keys("contact.subject", window, top),
+            daily_counts("status.daily", window),
+            top_keys("status.client", window, top),
+        )
+    except Exception as e:
+        logger.error(f"Error fetching stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch stats")
+    return Stats(
+        since=window[0],
+        until=window[-1],
+        contact_submissions=ContactStats(
+            total=sum(d.count for d in contact_daily), daily=contact_daily, top_subjects=subjects
+        ),
+        status_checks=StatusStats(
+            total=sum(d.count for d in status_daily), daily=status_daily, top_clients=clients
+        ),
+    )
+
+# Catalog Endpoints
+CATALOG_ADAPTERS = {
+    "menu": TypeAdapter(Menu),
+    "offers": TypeAdapter(List[Offer]),
+    "testimonials": TypeAdapter(List[Testimonial]),
+}
+CATALOG_EMPTY = {"menu": {"categories": []}, "offers": [], "testimonials": []}
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    value: Any
+    body: bytes
+    etag: str
+    loaded_at: float
+
+class CatalogCache:
+    """Serialized catalog documents kept in memory with their ETags.
+
+    Each catalog is stored in Mongo as a single document, so a write is one
+    atomic replace. The cached body is the exact response payload: hits
+    never touch the database or re-encode JSON.
+    """
+
+    def __init__(self, collection, ttl: float):
+        self.collection = collection
+        self.ttl = ttl
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._derived: Dict[Tuple[str, Any], Tuple[CatalogEntry, Any]] = {}
+
+    @staticmethod
+    def _entry(value, body: bytes) -> CatalogEntry:
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return CatalogEntry(value=value, body=body, etag=etag, loaded_at=time.monotonic())
+
+    def _fresh(self, entry: Optional[CatalogEntry]) -> bool:
+        return entry is not None and time.monotonic() - entry.loaded_at < self.ttl
+
+    async def get(self, name: str) -> CatalogEntry:
+        entry = self._entries.get(name)
+        if self._fresh(entry):
+            return entry
+        # Only one request per catalog goes to Mongo on a miss
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(name)
+            if self._fresh(entry):
+                return entry
+            document = await self.collection.find_one({"_id": name})
+            data = document["data"] if document else CATALOG_EMPTY[name]
+            adapter = CATALOG_ADAPTERS[name]
+            value = adapter.validate_python(data)
+            entry = self._entry(value, adapter.dump_json(value))
+            self._entries[name] = entry
+            return entry
+
+    async def derived(self, name: str, build):
+        """Return build(catalog value), recomputed only when the catalog changes"""
+        entry = await self.get(name)
+        cached = self._derived.get((name, build))
+        if cached is None or cached[0] is not entry:
+            cached = (entry, build(entry.value))
+            self._derived[(name, build)] = cached
+        return cached[1]
+
+    async def put(self, name: str, value) -> CatalogEntry:
+        adapter = CATALOG_ADAPTERS[name]
+        await self.collection.replace_one(
+            {"_id": name},
+            {"_id": name, "data": adapter.dump_python(value, mode="json")},
+            upsert=True,
+        )
+        entry = self._entry(value, adapter.dump_json(value))
+        self._entries[name] = entry
+        return entry
+
+catalog_cache: Optional[CatalogCache] = None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag (RFC 7232)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def catalog_response(entry: CatalogEntry, request: Request) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+async def seed_catalog(database):
+    """Insert the bundled catalog for any catalog that has never been written"""
+    with open(ROOT_DIR / 'catalog_seed.json') as f:
+        seed = json.load(f)
+    await database.catalog.bulk_write([
+        UpdateOne({"_id": name}, {"$setOnInsert": {"data": data}}, upsert=True)
+        for name, data in seed.items()
+    ], ordered=False)
+
+@api_router.get("/menu", response_model=Menu)
+async def get_menu(request: Request):
+    return catalog_response(await catalog_cache.get("menu"), request)
+
+@api_router.put("/menu", dependencies=[Depends(require_admin)], response_model=Menu)
+async def update_menu(menu: Menu, request: Request):
+    return catalog_response(await catalog_cache.put("menu", menu), request)
+
+@api_router.get("/offers", response_model=List[Offer])
+async def get_offers(request: Request):
+    return catalog_response(await catalog_cache.get("offers"), request)
+
+@api_router.put("/offers", dependencies=[Depends(require_admin)], response_model=List[Offer])
+async def update_offers(offers: List[Offer], request: Request):
+    return catalog_response(await catalog_cache.put("offers", offers), request)
+
+@api_router.get("/testimonials", response_model=List[Testimonial])
+async def get_testimonials(request: Request):
+    return catalog_response(await catalog_cache.get("testimonials"), request)
+
+@api_router.put("/testimonials", dependencies=[Depends(require_admin)], response_model=List[Testimonial])
+async def update_testimonials(testimonials: List[Testimonial], request: Request):
+    return catalog_response(await catalog_cache.put("testimonials", testimonials), request)
+
+# Placeholder Images
+PLACEHOLDER_BACKGROUND = (214, 195, 173)
+PLACEHOLDER_FOREGROUND = (111, 78, 55)
+PLACEHOLDER_MEDIA_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+def render_placeholder_svg(width: int, height: int) -> bytes:
+    background = "#%02x%02x%02x" % PLACEHOLDER_BACKGROUND
+    foreground = "#%02x%02x%02x" % PLACEHOLDER_FOREGROUND
+    font_size = max(8, min(width, height) // 6)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<rect width="100%" height="100%" fill="{background}"/>'
+        f'<text x="50%" y="50%" fill="{foreground}" font-family="sans-serif" '
+        f'font-size="{font_size}" text-anchor="middle" dominant-baseline="middle">'
+        f'{width}\u00d7{height}</text></svg>'
+    ).encode()
+
+def render_placeholder_png(width: int, height: int) -> bytes:
+    """Solid-colour RGB PNG, written directly so no imaging library is needed"""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    row = b"\x00" + bytes(PLACEHOLDER_BACKGROUND) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(row * height, 9))
+        + chunk(b"IEND", b"")
+    )
+
+PLACEHOLDER_RENDERERS = {"svg": render_placeholder_svg, "png": render_placeholder_png}
+
+class PlaceholderCache:
+    """LRU cache of rendered placeholders, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[int, int, str], Tuple[bytes, str]]" = OrderedDict()
+
+    async def get(self, width: int, height: int, fmt: str) -> Tuple[bytes, str]:
+        key = (width, height, fmt)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        # Large PNGs take a while to compress; keep that off the event loop
+        body = await asyncio.to_thread(PLACEHOLDER_RENDERERS[fmt], width, height)
+        entry = (body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        if key not in self._entries:
+            self._entries[key] = entry
+            self.size += len(body)
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        return entry
+
+placeholder_cache = PlaceholderCache(PLACEHOLDER_CACHE_BYTES)
+
+async def prewarm_placeholders():
+    for size in filter(None, (size.strip() for size in PLACEHOLDER_PREWARM.split(","))):
+        width, height = (int(value) for value in size.lower().split("x"))
+        for fmt in PLACEHOLDER_RENDERERS:
+            await placeholder_cache.get(width, height, fmt)
+
+@api_router.get("/placeholder/{width}/{height}")
+async def get_placeholder(
+    request: Request,
+    width: int = PathParam(..., ge=1, le=PLACEHOLDER_MAX_DIMENSION),
+    height: int = PathParam(..., ge=1, le=PLACEHOLDER_MAX_DIMENSION),
+    fmt: str = Query("svg", pattern="^(svg|png)$"),
+):
+    body, etag = await placeholder_cache.get(width, height, fmt)
+    # The URL fully determines the image, so it never needs revalidating
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=PLACEHOLDER_MEDIA_TYPES[fmt], headers=headers)
+
+# Image Derivatives
+IMAGE_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$")
+IMAGE_ORIGINAL_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+IMAGE_MEDIA_TYPES = {"webp": "image/webp", "jpg": "image/jpeg", "png": "image/png"}
+IMAGE_LOSSY_FORMATS = ("webp", "jpg")
+
+class ImageDerivativeCache:
+    """On-disk cache of resized/transcoded images.
+
+    A derivative's file name is a hash of the original's content plus the
+    effective width, format and quality, so each variant is encoded once and
+    a changed original can never be served stale. Widths at or above the
+    original's and qualities for PNG make no difference to the output, so
+    they are normalised away before hashing. Concurrent requests for a
+    variant that is still being encoded wait on the same pool job. Cache hits
+    touch the file's mtime, which is what eviction orders by.
+
+    Derivatives are handed out as open files, so eviction running in another
+    thread can unlink a file without breaking a response that is using it.
+    The cache size is first measured by the first eviction check.
+    """
+
+    def __init__(self, originals_dir: Path, cache_dir: Path, max_bytes: int, workers: int):
+        self.originals_dir = originals_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.size = 0
+        self._measured = False
+        self._pool = None
+        self._evicting = asyncio.Lock()
+        self._digests: Dict[Tuple[str, int, int], Tuple[str, int]] = {}
+        self._encoding: Dict[str, asyncio.Task] = {}
+
+    def start(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _executor(self):
+        """The process pool, created when the first image needs encoding"""
+        if self._pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn, not fork: the server process has threads of its own
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def find_original(self, image_id: str) -> Optional[Path]:
+        if not IMAGE_ID_PATTERN.match(image_id):
+            return None
+        for extension in IMAGE_ORIGINAL_EXTENSIONS:
+            candidate = self.originals_dir / f"{image_id}{extension}"
+            if candidate.is_file():
+                return candidate
+        return None
+
+    @staticmethod
+    def _inspect(original: Path) -> Tuple[str, int]:
+        """Content hash and pixel width of an original; runs in a thread"""
+        from PIL import Image
+
+        with Image.open(original) as image:
+            width = image.width
+        return hashlib.sha256(original.read_bytes()).hexdigest(), width
+
+    async def _original_info(self, original: Path) -> Tuple[str, int]:
+        stat = original.stat()
+        key = (str(original), stat.st_mtime_ns, stat.st_size)
+        info = self._digests.get(key)
+        if info is None:
+            info = await asyncio.to_thread(self._inspect, original)
+            self._digests[key] = info
+        return info
+
+    async def get(self, original: Path, width: Optional[int], fmt: str, quality: int) -> Tuple[BinaryIO, str]:
+        """The derivative opened for reading, encoding it first if needed, and
+        its ETag"""
+        digest, original_width = await self._original_info(original)
+        # Never upscaled, so any width from the original's up is the original size
+        if width is None or width >= original_width:
+            width = 0
+        if fmt not in IMAGE_LOSSY_FORMATS:
+            quality = 0
+        key = hashlib.sha256(f"{digest}:{width}:{fmt}:{quality}".encode()).hexdigest()
+        path = self.cache_dir / key[:2] / f"{key}.{fmt}"
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            # Not encoded yet, or evicted since
+            task = self._encoding.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._encode(original, path, width, fmt, quality))
+                self._encoding[key] = task
+                task.add_done_callback(lambda _: self._encoding.pop(key, None))
+            await asyncio.shield(task)
+            file = open(path, "rb")
+        os.utime(file.fileno())
+        return file, f'"{key[:32]}"'
+
+    async def _encode(self, original: Path, path: Path, width: int, fmt: str, quality: int):
+        import image_worker
+
+        path.parent.mkdir(exist_ok=True)
+        loop = asyncio.get_running_loop()
+        self.size += await loop.run_in_executor(
+            self._executor(), image_worker.transcode, str(original), str(path), width, fmt, quality
+        )
+        if not self._measured or self.size > self.max_bytes:
+            async with self._evicting:
+                # _evict rescans the whole cache, so its result replaces the
+                # running total rather than adding to it
+                if not self._measured or self.size > self.max_bytes:
+                    self.size = await asyncio.to_thread(self._evict)
+                    self._measured = True
+
+    def _files(self) -> list:
+        return [entry for directory in os.scandir(self.cache_dir) if directory.is_dir()
+                for entry in os.scandir(directory.path)
+                if entry.is_file() and not entry.name.endswith(".tmp")]
+
+    def _evict(self) -> int:
+        """Delete least recently used files down to 90% of the limit"""
+        files = sorted(((entry.stat(), entry.path) for entry in self._files()), key=lambda f: f[0].st_mtime)
+        size = sum(stat.st_size for stat, _ in files)
+        for stat, path in files:
+            if size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                size -= stat.st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+image_cache: Optional[ImageDerivativeCache] = None
+
+IMAGE_READ_CHUNK_SIZE = 64 * 1024
+
+async def iter_open_file(file: BinaryIO):
+    """Stream an already opened file, closing it at the end"""
+    try:
+        while chunk := await asyncio.to_thread(file.read, IMAGE_READ_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+@api_router.get("/images/{image_id}")
+async def get_image(
+    image_id: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=IMAGE_MAX_WIDTH),
+    fmt: str = Query("webp", pattern="^(webp|jpg|png)$"),
+    q: int = Query(80, ge=1, le=100),
+):
+    """A locally stored original, resized to at most w pixels wide and encoded as fmt"""
+    original = image_cache.find_original(image_id)
+    if original is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        file, etag = await image_cache.get(original, w, fmt, q)
+    except Exception as e:
+        logger.error(f"Error transcoding image {image_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to process image")
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        file.close()
+        return Response(status_code=304, headers=headers)
+    headers["Content-Length"] = str(os.fstat(file.fileno()).st_size)
+    return StreamingResponse(iter_open_file(file), media_type=IMAGE_MEDIA_TYPES[fmt], headers=headers)
+
+# Order Endpoints
+MONEY = Decimal("0.01")
+ORDER_BULK_MAX = 500
+
+def order_document(order: Order) -> dict:
+    """The order as stored in Mongo, with money as Decimal128"""
+    document = order.dict()
+    document["total"] = Decimal128(document["total"])
+    for line in document["items"]:
+        line["unit_price"] = Decimal128(line["unit_price"])
+        line["line_total"] = Decimal128(line["line_total"])
+    return document
+
+def menu_price_index(menu: Menu) -> Dict[int, Tuple[str, Decimal]]:
+    """item id -> (name, unit price), built once per catalog version"""
+    return {
+        item.id: (item.name, Decimal(str(item.price)).quantize(MONEY, ROUND_HALF_UP))
+        for category in menu.categories
+        for item in category.items
+    }
+
+class OrderPricingError(ValueError):
+    pass
+
+def price_order(order_data: OrderCreate, prices: Dict[int, Tuple[str, Decimal]]) -> Order:
+    unknown = sorted({line.item_id for line in order_data.items if line.item_id not in prices})
+    if unknown:
+        raise OrderPricingError(f"Unknown menu items: {', '.join(map(str, unknown))}")
+    lines = []
+    for line in order_data.items:
+        name, unit_price = prices[line.item_id]
+        lines.append(OrderLine(
+            item_id=line.item_id,
+            name=name,
+            unit_price=unit_price,
+            quantity=line.quantity,
+            line_total=(unit_price * line.quantity).quantize(MONEY, ROUND_HALF_UP),
+        ))
+    return Order(
+        items=lines,
+        total=sum((line.line_total for line in lines), Decimal("0.00")),
+        customer_name=order_data.customer_name,
+        notes=order_data.notes,
+    )
+
+@api_router.post("/orders", response_model=Order)
+async def place_order(order_data: OrderCreate):
+    """Price an order against the cached menu and store it in one write"""
+    prices = await catalog_cache.derived("menu", menu_price_index)
+    try:
+        order = price_order(order_data, prices)
+    except OrderPricingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        await db.orders.insert_one(order_document(order))
+    except Exception as e:
+        logger.error(f"Error placing order: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to place order")
+    return order
+
+@api_router.post("/orders/bulk", response_model=BulkOrderResult)
+async def place_orders_bulk(orders: List[OrderCreate]):
+    """Price a batch of orders (kiosk/POS sync) and store the valid ones with
+    a single insert_many. Invalid orders are reported by index."""
+    if len(orders) > ORDER_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ORDER_BULK_MAX} orders per request")
+    prices = await catalog_cache.derived("menu", menu_price_index)
+    placed, errors = [], []
+    for index, order_data in enumerate(orders):
+        try:
+            placed.append(price_order(order_data, prices))
+        except OrderPricingError as e:
+            errors.append(BulkOrderError(index=index, detail=str(e)))
+    if placed:
+        try:
+            await db.orders.insert_many([order_document(order) for order in placed], ordered=False)
+        except Exception as e:
+            logger.error(f"Error placing orders in bulk: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to place orders")
+    return BulkOrderResult(orders=placed, errors=errors)
+
+@api_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Multi-worker mode: aggregate the metric files of every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# Response Compression
+# Starlette's GZipMiddleware only speaks gzip and recompresses every
+# response; this one also negotiates brotli, reuses the compressed bytes of
+# repeated GET responses and keeps large bodies off the event loop.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/", "image/svg+xml")
+# Event streams must reach the client event by event, never buffered
+INCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = weight
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+class StreamCompressor:
+    """Compresses a streamed body chunk by chunk, flushing after each so
+    the client still receives every chunk as soon as it is sent"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes, last: bool) -> bytes:
+        if self._brotli is not None:
+            data = self._brotli.process(chunk)
+            return data + (self._brotli.finish() if last else self._brotli.flush())
+        data = self._zlib.compress(chunk)
+        return data + self._zlib.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+class CompressionCache:
+    """LRU of compressed bodies, bounded by total bytes.
+
+    Keyed by the response ETag where there is one (catalog, placeholders),
+    otherwise by a hash of the body, so unchanged list pages hit too.
+    Hashing is far cheaper than compressing.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: bytes):
+        if key in self._entries or len(value) > self.max_bytes:
+            return
+        self._entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+compression_cache = CompressionCache(COMPRESSION_CACHE_BYTES)
+
+class CompressionMiddleware:
+    """Compresses responses the client accepts in gzip or brotli.
+
+    Plain ASGI like MetricsMiddleware: a buffered response is compressed in
+    one go (via compression_cache for GETs), a streamed one chunk by chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+        stream = None
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = MutableHeaders(raw=list(start["headers"]))
+                eligible = (
+                    start["status"] not in (204, 206, 304)
+                    and "content-encoding" not in headers
+                    and compressible(headers.get("content-type", ""))
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                elif start["status"] == 304:
+                    self.match_validator(scope, headers)
+                start["headers"] = headers.raw
+                if not eligible or (not more_body and len(body) < COMPRESSION_MIN_SIZE):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The compressed bytes differ from what the ETag names
+                    headers["ETag"] = "W/" + etag
+                if not more_body:
+                    cacheable = scope["method"] == "GET" and start["status"] == 200 \
+                        and "no-store" not in headers.get("cache-control", "")
+                    compressed = await self.compress(body, encoding, etag, cacheable)
+                    headers["Content-Length"] = str(len(compressed))
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                del headers["Content-Length"]
+                stream = StreamCompressor(encoding)
+                await send(start)
+            if len(body) >= COMPRESSION_OFFLOAD_SIZE:
+                chunk = await asyncio.to_thread(stream.compress, body, not more_body)
+            else:
+                chunk = stream.compress(body, not more_body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def match_validator(scope, headers: MutableHeaders):
+        """Give a 304 the ETag the client holds: a compressed 200 carried the
+        weak form, so when that is what came back in If-None-Match, answer
+        with it rather than the app's strong tag"""
+        etag = headers.get("etag")
+        if not etag or etag.startswith("W/"):
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        if "W/" + etag in (tag.strip() for tag in if_none_match.split(",")):
+            headers["ETag"] = "W/" + etag
+            headers.add_vary_header("Accept-Encoding")
+
+    async def compress(self, body: bytes, encoding: str, etag: Optional[str], cacheable: bool) -> bytes:
+        key = None
+        if cacheable:
+            key = (etag or hashlib.blake2b(body, digest_size=16).digest(), encoding, len(body))
+            cached = compression_cache.get(key)
+            if cached is not None:
+                return cached
+        with span("compress"):
+            if len(body) >= COMPRESSION_OFFLOAD_SIZE:
+                compressed = await asyncio.to_thread(compress_body, body, encoding)
+            else:
+                compressed = compress_body(body, encoding)
+        if key is not None:
+            compression_cache.put(key, compressed)
+        return compressed
+
+class ServerTimingMiddleware:
+    """Collects phase spans for each request into a RequestTimings, sends
+    them as a Server-Timing header and logs requests over SLOW_REQUEST_MS.
+    Only installed when SERVER_TIMING or SLOW_REQUEST_MS is set."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING:
+                    headers = MutableHeaders(raw=list(message["headers"]))
+                    headers.append("Server-Timing", timings.header())
+                    message["headers"] = headers.raw
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
+            duration_ms = timings.elapsed() * 1000
+            if SLOW_REQUEST_MS and duration_ms >= SLOW_REQUEST_MS:
+                logger.warning(f"Slow request {scope['method']} {scope['path']} took {duration_ms:.0f} ms", extra={
+                    "http_method": scope["method"],
+                    "http_path": scope["path"],
+                    "http_status": status_code,
+                    "duration_ms": round(duration_ms, 1),
+                    "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in timings.phases.items()},
+                })
+
+class MetricsMiddleware:
+    """Records latency, in-flight count and response size per route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streaming responses pass
+    straight through and only the size of each body chunk is counted.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def route_name(self, scope) -> str:
+        # Label by template (/api/status), never by raw path, to keep the
+        # number of series bounded
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return route.path
+        return "<unmatched>"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route_name(scope)
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
+            RESPONSE_SIZE.labels(method, route).observe(response_size)
+            in_progress.dec()
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+LOG_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else arrived through extra=
+LOG_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with extra= fields as top-level keys"""
+
+    def __init__(self, max_length: int, policy: str, sample_rate: float):
+        super().__init__()
+        self.max_length = max_length
+        self.policy = policy
+        self.sample_rate = sample_rate
+
+    def limit(self, value):
+        if not isinstance(value, str) or len(value) <= self.max_length:
+            return value
+        if self.policy == "sample" and random.random() < self.sample_rate:
+            return value
+        if self.policy == "omit":
+            return f"<{len(value)} chars omitted>"
+        return value[:self.max_length] + f"...(+{len(value) - self.max_length} chars)"
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in LOG_RECORD_ATTRS:
+                entry[key] = self.limit(value)
+        return json.dumps(entry, default=str)
+
+def configure_logging() -> queue.SimpleQueue:
+    """Route all logging through a QueueHandler. Records wait in the queue
+    until start_log_listener() runs in the serving process."""
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # prepare() only merges args (and any traceback) into the message; the
+    # real formatting happens on the listener thread
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=LOG_LEVEL, handlers=[queue_handler])
+    return log_queue
+
+def start_log_listener(log_queue: queue.SimpleQueue) -> logging.handlers.QueueListener:
+    """Start the thread that formats queued records and writes them to stderr.
+    Threads do not survive fork(), so this runs per worker process."""
+    handler = logging.StreamHandler()
+    if LOG_FORMAT == 'json':
+        handler.setFormatter(JSONFormatter(LOG_FIELD_MAX_LENGTH, LOG_LARGE_FIELD_POLICY, LOG_FIELD_SAMPLE_RATE))
+    else:
+        handler.setFormatter(logging.Formatter(LOG_TEXT_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+log_queue = configure_logging()
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+# Indexes every endpoint query relies on, per collection. create_indexes is
+# a no-op for indexes that already exist with the same spec.
+INDEXES = {
+    "status_checks": [
+        # Keyset pagination in get_status_checks
+        IndexModel([("timestamp", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "contact_submissions": [
+        # Newest-first admin list and the since= export range
+        IndexModel([("timestamp", DESCENDING)]),
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING), ("timestamp", DESCENDING)]),
+        # GET /api/contact/search; subject and sender outrank body text
+        IndexModel(
+            [("name", TEXT), ("email", TEXT), ("subject", TEXT), ("message", TEXT)],
+            weights={"subject": 5, "name": 3, "email": 3, "message": 1},
+            name="contact_text",
+        ),
+    ],
+    "orders": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("timestamp", DESCENDING)]),
+    ],
+    "rollups": [
+        # /api/stats reads one metric over a range of days
+        IndexModel([("metric", ASCENDING), ("day", ASCENDING)]),
+    ],
+    "email_outbox": [
+        # Workers claim the oldest due message
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+    ],
+}
+
+# One representative query per endpoint, built with the same helpers the
+# endpoints use so the checked plan cannot drift from the served one
+QUERY_PLAN_CHECKS = {
+    "GET /api/status": lambda database: status_checks_page(
+        database.status_checks, {}, STATUS_PAGE_DEFAULT
+    ),
+    "GET /api/status?after=": lambda database: status_checks_page(
+        database.status_checks,
+        decode_status_cursor(encode_status_cursor({"timestamp": datetime.utcnow(), "id": ""})),
+        STATUS_PAGE_DEFAULT,
+    ),
+    "GET /api/contact": lambda database: recent_contact_submissions(
+        database.contact_submissions
+    ),
+    "GET /api/contact/export?since=": lambda database: contact_export_cursor(
+        database.contact_submissions, {"timestamp": {"$gte": datetime.utcnow()}}
+    ),
+}
+
+async def ensure_indexes(database):
+    async def ensure(collection_name, indexes):
+        names = await database[collection_name].create_indexes(indexes)
+        logger.info(f"Indexes ready on {collection_name}: {', '.join(names)}")
+
+    # Collections are independent, so build them concurrently rather than
+    # paying one round trip after another at startup. The idempotency key is
+    # the _id, which is unique; the TTL index only expires old keys.
+    await asyncio.gather(
+        *(ensure(name, indexes) for name, indexes in INDEXES.items()),
+        ensure_ttl_index(database.idempotency_keys, IDEMPOTENCY_TTL_INDEX_NAME, "created_at", IDEMPOTENCY_TTL),
+    )
+
+async def ensure_ttl_index(collection, name: str, field: str, expire_after: int):
+    """Create a TTL index, or retune an existing one with collMod.
+
+    TTL indexes stay out of INDEXES because create_indexes rejects an index
+    whose expiry has changed (IndexOptionsConflict), which would stop every
+    worker from starting after the TTL setting is changed.
+    """
+    current = (await collection.index_information()).get(name)
+    if current is None:
+        await collection.create_index([(field, ASCENDING)], name=name, expireAfterSeconds=expire_after)
+    elif current.get("expireAfterSeconds") != expire_after:
+        await collection.database.command(
+            "collMod", collection.name, index={"name": name, "expireAfterSeconds": expire_after},
+        )
+
+def plan_stages(plan) -> set:
+    """Collect every stage name used anywhere in an explain() plan tree"""
+    stages = set()
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            stages |= plan_stages(item)
+    return stages
+
+async def verify_query_plans(database):
+    """Raise if any endpoint query is planned as a COLLSCAN or in-memory SORT"""
+    failures = []
+    for endpoint, build_cursor in QUERY_PLAN_CHECKS.items():
+        explained = await build_cursor(database).explain()
+        stages = plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+        bad_stages = stages & {"COLLSCAN", "SORT"}
+        if bad_stages:
+            failures.append(f"{endpoint}: {', '.join(sorted(bad_stages))}")
+        else:
+            logger.info(f"Query plan for {endpoint} OK: {', '.join(sorted(stages))}")
+    if failures:
+        raise RuntimeError("Unindexed query plans: " + "; ".join(failures))
+
+@contextmanager
+def startup_phase(timings: dict, name: str):
+    """Record how long a step of the lifespan startup took, in milliseconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-process startup and shutdown.
+
+    Everything that owns sockets, threads or tasks (the Motor client, the
+    log listener, background workers) is created here rather than at import
+    time, so each worker of a pre-forking server gets its own.
+    """
+    global client, db, catalog_cache, status_write_buffer, email_outbox, image_cache, idempotency_store
+    global contact_hub
+    log_listener = start_log_listener(log_queue)
+    client = AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        event_listeners=[mongo_command_metrics],
+    )
+    db = client[MONGO_DB_NAME]
+    timings = {}
+    placeholder_prewarm = None
+    try:
+        with startup_phase(timings, "indexes"):
+            await asyncio.gather(ensure_indexes(db), ensure_status_retention(db))
+        if VERIFY_QUERY_PLANS:
+            with startup_phase(timings, "query_plans"):
+                await verify_query_plans(db)
+
+        with startup_phase(timings, "catalog"):
+            catalog_cache = CatalogCache(db.catalog, CATALOG_CACHE_TTL)
+            await seed_catalog(db)
+            # Warm the cache so the first catalog requests are served from memory
+            await asyncio.gather(*(catalog_cache.get(name) for name in CATALOG_ADAPTERS))
+
+        idempotency_store = IdempotencyStore(db.idempotency_keys, IDEMPOTENCY_CACHE_SIZE)
+        contact_hub = FanoutHub(CONTACT_STREAM_QUEUE_SIZE, CONTACT_STREAM_MAX_SUBSCRIBERS)
+
+        if STATUS_WRITE_BEHIND:
+            status_write_buffer = WriteBehindBuffer(
+                db.status_checks, STATUS_BATCH_SIZE, STATUS_FLUSH_INTERVAL, STATUS_BUFFER_MAX,
+                on_inserted=lambda documents: apply_rollups(status_rollup_keys, documents),
+            )
+            status_write_buffer.start()
+
+        if SMTP_HOST and CONTACT_NOTIFY_TO:
+            email_outbox = EmailOutbox(
+                db.email_outbox, EMAIL_WORKERS, EMAIL_BATCH_SIZE, EMAIL_MAX_ATTEMPTS,
+                EMAIL_RETRY_BASE, EMAIL_POLL_INTERVAL,
+            )
+            email_outbox.start()
+
+        # Placeholder rendering is CPU work the first request does not need
+        placeholder_prewarm = asyncio.create_task(prewarm_placeholders())
+
+        image_cache = ImageDerivativeCache(
+            IMAGE_ORIGINALS_DIR, IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_WORKERS
+        )
+        image_cache.start()
+
+        logger.info(
+            f"Worker {os.getpid()} ready (Mongo pool {MONGO_MIN_POOL_SIZE}-{MONGO_MAX_POOL_SIZE})",
+            extra={"startup_ms": timings},
+        )
+        yield
+    finally:
+        if placeholder_prewarm is not None:
+            placeholder_prewarm.cancel()
+        # Under uvicorn the exit signal has closed the hub already; this
+        # covers servers that run lifespan shutdown with streams still open
+        if contact_hub is not None:
+            contact_hub.close()
+            contact_hub = None
+        # Flush buffered status checks before the connection goes away
+        if status_write_buffer is not None:
+            await status_write_buffer.close()
+            status_write_buffer = None
+        if email_outbox is not None:
+            await email_outbox.close()
+            email_outbox = None
+        if image_cache is not None:
+            await asyncio.to_thread(image_cache.close)
+            image_cache = None
+        idempotency_store = None
+        client.close()
+        # Drain queued log records last so the shutdown messages above are written
+        log_listener.stop()
+
+def create_app() -> FastAPI:
+    """Build the application. Importing this module opens no connections
+    and starts no tasks, so it is safe to preload before forking workers.
+    Besides logging setup, its only side effect is that under uvicorn it
+    wraps Server.handle_exit (see close_streams_on_exit)."""
+    # Create the main app without a prefix
+    app = FastAPI(lifespan=lifespan)
+
+    # Include the router in the main app
+    app.include_router(api_router)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+    if SERVER_TIMING or SLOW_REQUEST_MS:
+        app.add_middleware(ServerTimingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+app = create_app()
+
+MAINTENANCE_COMMANDS = {
+    "backfill-rollups": backfill_rollups,
+    "archive-status-checks": archive_status_checks,
+}
+
+async def run_maintenance(command: str):
+    log_listener = start_log_listener(log_queue)
+    maintenance_client = AsyncIOMotorClient(mongo_url)
+    try:
+        database = maintenance_client[MONGO_DB_NAME]
+        await ensure_indexes(database)
+        result = await MAINTENANCE_COMMANDS[command](database)
+        logger.info(f"{command} finished: {result}")
+    finally:
+        maintenance_client.close()
+        log_listener.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Coffee Shop API maintenance commands")
+    parser.add_argument("command", choices=list(MAINTENANCE_COMMANDS))
+    args = parser.parse_args()
+    asyncio.run(run_maintenance(args.command))
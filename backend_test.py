@@ -10,6 +10,7 @@ import time
 from datetime import datetime
 import sys
 import os
+import uuid
 
 # Get backend URL from frontend .env file
 def get_backend_url():
@@ -28,6 +29,14 @@ if not BACKEND_URL:
     sys.exit(1)
 
 API_BASE_URL = f"{BACKEND_URL}/api"
+
+# Appended to contact messages so repeated runs are not rejected as duplicates
+RUN_ID = uuid.uuid4().hex[:8]
+
+# Admin endpoints need the deployment's ADMIN_TOKEN; without it their tests
+# are skipped and only the refusal of anonymous access is checked
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+ADMIN_HEADERS = {"Authorization": f"Bearer {ADMIN_TOKEN}"} if ADMIN_TOKEN else {}
 print(f"Testing backend at: {API_BASE_URL}")
 
 class BackendTester:
@@ -60,6 +69,14 @@ class BackendTester:
         if message:
             print(f"    {message}")
     
+    def skip_without_admin(self, test_name):
+        """Skip an admin endpoint test when no ADMIN_TOKEN is configured"""
+        if ADMIN_TOKEN:
+            return False
+        print(f"⏭️  SKIP: {test_name}")
+        print("    Set ADMIN_TOKEN to test admin endpoints")
+        return True
+    
     def test_health_check(self):
         """Test basic health check endpoint"""
         try:
@@ -129,8 +146,9 @@ class BackendTester:
             response_time = time.time() - start_time
             
             if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list):
+                page = response.json()
+                data = page.get('items') if isinstance(page, dict) else None
+                if isinstance(data, list) and 'next_cursor' in page:
                     self.log_test("Get Status Checks (GET /api/status)", True, 
                                 f"Retrieved {len(data)} status checks", response_time)
                     
@@ -147,7 +165,7 @@ class BackendTester:
                                         f"Missing fields in response: {missing_fields}")
                 else:
                     self.log_test("Get Status Checks (GET /api/status)", False, 
-                                f"Expected list, got {type(data)}", response_time)
+                                f"Expected page with items and next_cursor, got {page}", response_time)
             else:
                 self.log_test("Get Status Checks (GET /api/status)", False, 
                             f"HTTP {response.status_code}: {response.text}", response_time)
@@ -155,6 +173,192 @@ class BackendTester:
         except requests.exceptions.RequestException as e:
             self.log_test("Get Status Checks (GET /api/status)", False, f"Connection error: {str(e)}")
     
+    def test_status_bulk_ingest(self):
+        """Test NDJSON bulk ingest stores valid lines and reports bad ones"""
+        try:
+            lines = [json.dumps({"client_name": f"bulk-{RUN_ID}-{i}"}) for i in range(5)]
+            lines.insert(2, json.dumps({"client_name": 42}))
+            start_time = time.time()
+            response = requests.post(f"{API_BASE_URL}/status/bulk", 
+                                   data="\n".join(lines) + "\n",
+                                   headers={"Content-Type": "application/x-ndjson"},
+                                   timeout=30)
+            response_time = time.time() - start_time
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data['inserted'] == 5 and [e['line'] for e in data['errors']] == [3]:
+                    self.log_test("Status Bulk Ingest", True, 
+                                f"Inserted {data['inserted']}, rejected line 3", response_time)
+                else:
+                    self.log_test("Status Bulk Ingest", False, 
+                                f"Unexpected result: {data}", response_time)
+            else:
+                self.log_test("Status Bulk Ingest", False, 
+                            f"HTTP {response.status_code}: {response.text}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Status Bulk Ingest", False, f"Connection error: {str(e)}")
+    
+    def test_status_idempotency_key(self):
+        """Test a retried POST with the same Idempotency-Key returns the original"""
+        try:
+            headers = {"Content-Type": "application/json", "Idempotency-Key": f"status-{RUN_ID}"}
+            payload = {"client_name": f"idempotent-{RUN_ID}"}
+            start_time = time.time()
+            first = requests.post(f"{API_BASE_URL}/status", json=payload, headers=headers, timeout=10)
+            retry = requests.post(f"{API_BASE_URL}/status", json=payload, headers=headers, timeout=10)
+            response_time = time.time() - start_time
+            
+            if first.status_code == 200 and retry.status_code == 200:
+                if first.json()['id'] == retry.json()['id'] and retry.headers.get('Idempotent-Replayed') == 'true':
+                    self.log_test("Status Idempotency Key", True, 
+                                f"Retry replayed status check {first.json()['id']}", response_time)
+                else:
+                    self.log_test("Status Idempotency Key", False, 
+                                "Retry created a new status check", response_time)
+            else:
+                self.log_test("Status Idempotency Key", False, 
+                            f"HTTP {first.status_code}/{retry.status_code}: {retry.text}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Status Idempotency Key", False, f"Connection error: {str(e)}")
+    
+    def test_status_checks_pagination(self):
+        """Test keyset pagination of status checks"""
+        try:
+            start_time = time.time()
+            first = requests.get(f"{API_BASE_URL}/status", params={"limit": 1}, timeout=10)
+            response_time = time.time() - start_time
+            
+            if first.status_code != 200:
+                self.log_test("Status Checks Pagination", False, 
+                            f"HTTP {first.status_code}: {first.text}", response_time)
+                return
+            
+            page = first.json()
+            if len(page['items']) > 1:
+                self.log_test("Status Checks Pagination", False, 
+                            f"Expected at most 1 item, got {len(page['items'])}", response_time)
+                return
+            
+            if not page['next_cursor']:
+                self.log_test("Status Checks Pagination", True, 
+                            "Single page only, no cursor returned", response_time)
+                return
+            
+            second = requests.get(f"{API_BASE_URL}/status", 
+                                params={"limit": 1, "after": page['next_cursor']}, timeout=10)
+            next_items = second.json().get('items', []) if second.status_code == 200 else []
+            if next_items and next_items[0]['id'] != page['items'][0]['id']:
+                self.log_test("Status Checks Pagination", True, 
+                            "Cursor returned the next status check", response_time)
+            else:
+                self.log_test("Status Checks Pagination", False, 
+                            f"Cursor did not advance: HTTP {second.status_code}", response_time)
+            
+            invalid = requests.get(f"{API_BASE_URL}/status", params={"after": "not-a-cursor"}, timeout=10)
+            self.log_test("Invalid Status Cursor", invalid.status_code == 400, 
+                        f"Invalid cursor returned HTTP {invalid.status_code}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Status Checks Pagination", False, f"Connection error: {str(e)}")
+    
+    def test_catalog_etags(self):
+        """Test catalog endpoints return ETags and honour If-None-Match"""
+        for endpoint in ["menu", "offers", "testimonials"]:
+            try:
+                start_time = time.time()
+                response = requests.get(f"{API_BASE_URL}/{endpoint}", timeout=10)
+                response_time = time.time() - start_time
+                
+                etag = response.headers.get('ETag')
+                if response.status_code != 200 or not etag:
+                    self.log_test(f"Catalog ETag (GET /api/{endpoint})", False, 
+                                f"HTTP {response.status_code}, ETag: {etag}", response_time)
+                    continue
+                
+                revalidated = requests.get(f"{API_BASE_URL}/{endpoint}", 
+                                         headers={"If-None-Match": etag}, timeout=10)
+                if revalidated.status_code == 304 and revalidated.headers.get('ETag') == etag:
+                    self.log_test(f"Catalog ETag (GET /api/{endpoint})", True, 
+                                f"Revalidation returned 304 for {etag}", response_time)
+                elif revalidated.status_code == 304:
+                    self.log_test(f"Catalog ETag (GET /api/{endpoint})", False, 
+                                f"304 carried {revalidated.headers.get('ETag')}, expected {etag}", response_time)
+                else:
+                    self.log_test(f"Catalog ETag (GET /api/{endpoint})", False, 
+                                f"Expected 304 on revalidation, got {revalidated.status_code}", response_time)
+                    
+            except requests.exceptions.RequestException as e:
+                self.log_test(f"Catalog ETag (GET /api/{endpoint})", False, f"Connection error: {str(e)}")
+    
+    def test_admin_writes_require_token(self):
+        """Test anonymous catalog writes and contact imports, exports, searches and streams are refused"""
+        try:
+            menu = requests.get(f"{API_BASE_URL}/menu", timeout=10).json()
+            response = requests.put(f"{API_BASE_URL}/menu", json=menu, timeout=10)
+            self.log_test("Catalog Write Without Admin Token", response.status_code in (401, 403), 
+                        f"HTTP {response.status_code}")
+            
+            line = json.dumps({"name": "Bulk", "email": "bulk@example.com", 
+                               "subject": "Bulk", "message": f"Bulk import {RUN_ID}"})
+            response = requests.post(f"{API_BASE_URL}/contact/bulk", data=line + "\n", 
+                                   headers={"Content-Type": "application/x-ndjson"}, timeout=10)
+            self.log_test("Contact Import Without Admin Token", response.status_code in (401, 403), 
+                        f"HTTP {response.status_code}")
+            
+            response = requests.get(f"{API_BASE_URL}/contact/export", timeout=10)
+            self.log_test("Contact Export Without Admin Token", response.status_code in (401, 403), 
+                        f"HTTP {response.status_code}")
+            
+            response = requests.get(f"{API_BASE_URL}/contact/search", params={"q": "coffee"}, timeout=10)
+            self.log_test("Contact Search Without Admin Token", response.status_code in (401, 403), 
+                        f"HTTP {response.status_code}")
+            
+            response = requests.get(f"{API_BASE_URL}/contact/stream", stream=True, timeout=10)
+            response.close()
+            self.log_test("Contact Stream Without Admin Token", response.status_code in (401, 403), 
+                        f"HTTP {response.status_code}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Admin Writes Without Token", False, f"Connection error: {str(e)}")
+    
+    def test_place_order(self):
+        """Test server-side order pricing against the menu"""
+        try:
+            menu = requests.get(f"{API_BASE_URL}/menu", timeout=10).json()
+            items = [item for category in menu['categories'] for item in category['items']][:2]
+            if not items:
+                self.log_test("Place Order (POST /api/orders)", False, "Menu is empty")
+                return
+            
+            order_data = {"items": [{"item_id": item['id'], "quantity": 2} for item in items]}
+            start_time = time.time()
+            response = requests.post(f"{API_BASE_URL}/orders", json=order_data, timeout=10)
+            response_time = time.time() - start_time
+            
+            if response.status_code == 200:
+                data = response.json()
+                expected_total = sum(round(item['price'] * 2, 2) for item in items)
+                if abs(float(data['total']) - expected_total) < 0.005:
+                    self.log_test("Place Order (POST /api/orders)", True, 
+                                f"Order {data['id']} priced at {data['total']}", response_time)
+                else:
+                    self.log_test("Place Order (POST /api/orders)", False, 
+                                f"Expected total {expected_total:.2f}, got {data['total']}", response_time)
+            else:
+                self.log_test("Place Order (POST /api/orders)", False, 
+                            f"HTTP {response.status_code}: {response.text}", response_time)
+            
+            unknown = requests.post(f"{API_BASE_URL}/orders", 
+                                  json={"items": [{"item_id": -1, "quantity": 1}]}, timeout=10)
+            self.log_test("Order With Unknown Item", unknown.status_code == 422, 
+                        f"Unknown menu item returned HTTP {unknown.status_code}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Place Order (POST /api/orders)", False, f"Connection error: {str(e)}")
+    
     def test_invalid_endpoints(self):
         """Test error handling for invalid endpoints"""
         try:
@@ -257,7 +461,7 @@ class BackendTester:
                 "name": "Sarah Johnson",
                 "email": "sarah.johnson@example.com",
                 "subject": "Coffee Quality Inquiry",
-                "message": "I'm interested in learning more about your premium coffee beans and brewing methods. Could you provide information about your sourcing practices?"
+                "message": f"I'm interested in learning more about your premium coffee beans and brewing methods. Could you provide information about your sourcing practices? (run {RUN_ID})"
             }
             
             start_time = time.time()
@@ -304,7 +508,7 @@ class BackendTester:
                 "email": "michael.chen@example.com",
                 "phone": "+1-555-123-4567",
                 "subject": "Catering Services",
-                "message": "I'm planning a corporate event and would like to discuss catering options for premium coffee service."
+                "message": f"I'm planning a corporate event and would like to discuss catering options for premium coffee service. (run {RUN_ID})"
             }
             
             start_time = time.time()
@@ -449,7 +653,7 @@ class BackendTester:
                 "name": "José María O'Connor-Smith",
                 "email": "jose.maria@example.com",
                 "subject": "Special Characters Test",
-                "message": "Testing special characters: áéíóú, ñ, ç, ü, and symbols like @#$%^&*()!"
+                "message": f"Testing special characters: áéíóú, ñ, ç, ü, and symbols like @#$%^&*()! (run {RUN_ID})"
             }
             
             start_time = time.time()
@@ -475,6 +679,31 @@ class BackendTester:
         except requests.exceptions.RequestException as e:
             self.log_test("Special Characters Handling", False, f"Connection error: {str(e)}")
     
+    def test_contact_form_duplicate_rejected(self):
+        """Test that an identical resubmission is rejected with 429 and Retry-After"""
+        try:
+            test_data = {
+                "name": "Duplicate Tester",
+                "email": f"duplicate.{RUN_ID}@example.com",
+                "subject": "Duplicate Check",
+                "message": f"This message is sent twice to check duplicate suppression. (run {RUN_ID})"
+            }
+            
+            first = requests.post(f"{API_BASE_URL}/contact", json=test_data, timeout=10)
+            start_time = time.time()
+            second = requests.post(f"{API_BASE_URL}/contact", json=test_data, timeout=10)
+            response_time = time.time() - start_time
+            
+            if first.status_code == 200 and second.status_code == 429 and second.headers.get('Retry-After'):
+                self.log_test("Duplicate Submission Rejected", True, 
+                            f"Retry-After: {second.headers['Retry-After']}s", response_time)
+            else:
+                self.log_test("Duplicate Submission Rejected", False, 
+                            f"Expected 200 then 429, got {first.status_code} then {second.status_code}", response_time)
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Duplicate Submission Rejected", False, f"Connection error: {str(e)}")
+    
     def test_get_contact_submissions(self):
         """Test retrieving all contact submissions (admin endpoint)"""
         try:
@@ -520,8 +749,164 @@ class BackendTester:
         except requests.exceptions.RequestException as e:
             self.log_test("Get Contact Submissions", False, f"Connection error: {str(e)}")
     
+    def test_contact_submission_fields(self):
+        """Test ?fields= returns only the requested contact fields"""
+        try:
+            start_time = time.time()
+            response = requests.get(f"{API_BASE_URL}/contact", 
+                                  params={"fields": "name,subject,timestamp"}, timeout=10)
+            response_time = time.time() - start_time
+            
+            if response.status_code == 200:
+                data = response.json()
+                if all(set(item) == {'name', 'subject', 'timestamp'} for item in data):
+                    self.log_test("Contact Submission Fields", True, 
+                                f"Retrieved {len(data)} slim submissions", response_time)
+                else:
+                    self.log_test("Contact Submission Fields", False, 
+                                f"Unexpected fields: {sorted(data[0])}", response_time)
+            else:
+                self.log_test("Contact Submission Fields", False, 
+                            f"HTTP {response.status_code}: {response.text}")
+            
+            response = requests.get(f"{API_BASE_URL}/contact", params={"fields": "password"}, timeout=10)
+            self.log_test("Contact Submission Unknown Field", response.status_code == 400, 
+                        f"HTTP {response.status_code} for an unknown field")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Contact Submission Fields", False, f"Connection error: {str(e)}")
+    
+    def test_export_contact_submissions(self):
+        """Test streaming NDJSON export of contact submissions"""
+        if self.skip_without_admin("Export Contact Submissions (NDJSON)"):
+            return
+        try:
+            start_time = time.time()
+            response = requests.get(f"{API_BASE_URL}/contact/export", stream=True, 
+                                  headers=ADMIN_HEADERS, timeout=30)
+            
+            if response.status_code == 200:
+                rows = [json.loads(line) for line in response.iter_lines() if line]
+                response_time = time.time() - start_time
+                timestamps = [row['timestamp'] for row in rows]
+                if timestamps == sorted(timestamps):
+                    self.log_test("Export Contact Submissions (NDJSON)", True, 
+                                f"Streamed {len(rows)} submissions in ascending order", response_time)
+                else:
+                    self.log_test("Export Contact Submissions (NDJSON)", False, 
+                                "Exported submissions not in ascending timestamp order", response_time)
+            else:
+                self.log_test("Export Contact Submissions (NDJSON)", False, 
+                            f"HTTP {response.status_code}: {response.text}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Export Contact Submissions (NDJSON)", False, f"Connection error: {str(e)}")
+    
+    def test_contact_stream(self):
+        """Test a new submission is pushed to an open event stream"""
+        if self.skip_without_admin("Contact Stream (SSE)"):
+            return
+        try:
+            start_time = time.time()
+            with requests.get(f"{API_BASE_URL}/contact/stream", stream=True, 
+                              headers=ADMIN_HEADERS, timeout=(10, 20)) as stream:
+                if stream.status_code != 200:
+                    self.log_test("Contact Stream (SSE)", False, 
+                                f"HTTP {stream.status_code}: {stream.text}")
+                    return
+                
+                test_data = {
+                    "name": "Stream Tester",
+                    "email": f"stream-{RUN_ID}@example.com",
+                    "subject": "Live feed",
+                    "message": f"Checking the live contact feed (run {RUN_ID})"
+                }
+                response = requests.post(f"{API_BASE_URL}/contact", json=test_data, timeout=10)
+                if response.status_code != 200:
+                    self.log_test("Contact Stream (SSE)", False, 
+                                f"Submission failed: HTTP {response.status_code}: {response.text}")
+                    return
+                
+                contact_id = response.json()['id']
+                for line in stream.iter_lines(decode_unicode=True):
+                    if line == f"id: {contact_id}":
+                        self.log_test("Contact Stream (SSE)", True, 
+                                    f"Received event for {contact_id}", time.time() - start_time)
+                        return
+                self.log_test("Contact Stream (SSE)", False,
+                            f"Stream ended before the event for {contact_id} arrived")
+
+        except requests.exceptions.RequestException as e:
+            # With several workers the submission may land on a worker other
+            # than the one serving the stream
+            self.log_test("Contact Stream (SSE)", False, f"No event received: {str(e)}")
+    
+    def test_search_contact_submissions(self):
+        """Test full-text search finds this run's submissions, best match first"""
+        if self.skip_without_admin("Search Contact Submissions"):
+            return
+        try:
+            start_time = time.time()
+            response = requests.get(f"{API_BASE_URL}/contact/search", 
+                                  params={"q": RUN_ID, "limit": 5}, headers=ADMIN_HEADERS, timeout=10)
+            response_time = time.time() - start_time
+            
+            if response.status_code == 200:
+                data = response.json()
+                scores = [hit['score'] for hit in data['items']]
+                if not data['items']:
+                    self.log_test("Search Contact Submissions", False, 
+                                f"No results for run id {RUN_ID}", response_time)
+                elif not all(RUN_ID in hit['message'] or RUN_ID in hit['email'] for hit in data['items']):
+                    self.log_test("Search Contact Submissions", False, 
+                                "Search returned submissions that do not match", response_time)
+                elif scores != sorted(scores, reverse=True):
+                    self.log_test("Search Contact Submissions", False, 
+                                "Results not ordered by relevance", response_time)
+                else:
+                    self.log_test("Search Contact Submissions", True, 
+                                f"Found {len(data['items'])} matches, next_page={data['next_page']}", response_time)
+            else:
+                self.log_test("Search Contact Submissions", False, 
+                            f"HTTP {response.status_code}: {response.text}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Search Contact Submissions", False, f"Connection error: {str(e)}")
+    
+    def test_stats(self):
+        """Test the rollup-backed stats endpoint"""
+        try:
+            start_time = time.time()
+            response = requests.get(f"{API_BASE_URL}/stats", params={"days": 7}, timeout=10)
+            response_time = time.time() - start_time
+            
+            if response.status_code == 200:
+                data = response.json()
+                contact = data['contact_submissions']
+                if len(contact['daily']) != 7:
+                    self.log_test("Stats Rollups", False, 
+                                f"Expected 7 daily buckets, got {len(contact['daily'])}", response_time)
+                elif contact['total'] != sum(day['count'] for day in contact['daily']) or contact['total'] < 1:
+                    self.log_test("Stats Rollups", False, 
+                                f"Contact total {contact['total']} does not match daily buckets", response_time)
+                else:
+                    self.log_test("Stats Rollups", True, 
+                                f"{contact['total']} submissions, {data['status_checks']['total']} status checks "
+                                f"since {data['since']}", response_time)
+            else:
+                self.log_test("Stats Rollups", False, 
+                            f"HTTP {response.status_code}: {response.text}")
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Stats Rollups", False, f"Connection error: {str(e)}")
+    
     def test_concurrent_contact_submissions(self):
-        """Test concurrent contact form submissions"""
+        """Test concurrent contact form submissions.
+        
+        The suite sends at most 10 contact submissions from one address, the
+        default per-IP burst (CONTACT_IP_BURST); a 429 from a tighter
+        limit or a quick re-run is reported apart from real failures.
+        """
         import threading
         import queue
         
@@ -531,9 +916,9 @@ class BackendTester:
             try:
                 test_data = {
                     "name": f"Concurrent User {thread_id}",
-                    "email": f"user{thread_id}@example.com",
+                    "email": f"user{thread_id}-{RUN_ID}@example.com",
                     "subject": f"Concurrent Test {thread_id}",
-                    "message": f"This is a concurrent test message from thread {thread_id}. Testing system stability under load."
+                    "message": f"This is a concurrent test message from thread {thread_id}. Testing system stability under load. (run {RUN_ID})"
                 }
                 
                 response = requests.post(f"{API_BASE_URL}/contact", 
@@ -541,14 +926,14 @@ class BackendTester:
                                        headers={"Content-Type": "application/json"},
                                        timeout=10)
                 
-                results_queue.put((thread_id, response.status_code == 200, response.status_code))
+                results_queue.put((thread_id, response.status_code))
                 
             except Exception as e:
-                results_queue.put((thread_id, False, str(e)))
+                results_queue.put((thread_id, str(e)))
         
-        # Create and start 5 concurrent threads
+        # Create and start 4 concurrent threads
         threads = []
-        for i in range(5):
+        for i in range(4):
             thread = threading.Thread(target=submit_contact_form, args=(i+1,))
             threads.append(thread)
             thread.start()
@@ -559,20 +944,31 @@ class BackendTester:
         
         # Collect results
         successful_submissions = 0
+        rate_limited = 0
         total_submissions = 0
         
         while not results_queue.empty():
-            thread_id, success, status = results_queue.get()
+            thread_id, status = results_queue.get()
             total_submissions += 1
-            if success:
+            if status == 200:
                 successful_submissions += 1
+            elif status == 429:
+                rate_limited += 1
         
+        failed = total_submissions - successful_submissions - rate_limited
         if successful_submissions == total_submissions:
             self.log_test("Concurrent Contact Submissions", True, 
                         f"All {total_submissions} concurrent submissions successful")
+        elif failed == 0 and successful_submissions:
+            self.log_test("Concurrent Contact Submissions", True, 
+                        f"{successful_submissions}/{total_submissions} successful, {rate_limited} rate limited (429)")
+        elif failed == 0:
+            self.log_test("Concurrent Contact Submissions", False, 
+                        f"All {total_submissions} submissions rate limited (429); wait a minute and re-run")
         else:
             self.log_test("Concurrent Contact Submissions", False, 
-                        f"Only {successful_submissions}/{total_submissions} concurrent submissions successful")
+                        f"Only {successful_submissions}/{total_submissions} concurrent submissions successful, "
+                        f"{rate_limited} rate limited")
     
     def run_all_tests(self):
         """Run all backend tests"""
@@ -589,6 +985,12 @@ class BackendTester:
         self.test_health_check()
         self.test_create_status_check()
         self.test_get_status_checks()
+        self.test_status_checks_pagination()
+        self.test_status_bulk_ingest()
+        self.test_status_idempotency_key()
+        self.test_catalog_etags()
+        self.test_admin_writes_require_token()
+        self.test_place_order()
         
         # Contact Form API Tests
         print("\n📧 CONTACT FORM API TESTS")
@@ -596,6 +998,11 @@ class BackendTester:
         self.test_contact_form_valid_submission()
         self.test_contact_form_with_phone()
         self.test_get_contact_submissions()
+        self.test_contact_submission_fields()
+        self.test_export_contact_submissions()
+        self.test_contact_stream()
+        self.test_search_contact_submissions()
+        self.test_stats()
         
         # Validation Tests
         print("\n✅ VALIDATION TESTS")
@@ -604,6 +1011,7 @@ class BackendTester:
         self.test_contact_form_invalid_email()
         self.test_contact_form_message_length_validation()
         self.test_contact_form_special_characters()
+        self.test_contact_form_duplicate_rejected()
         
         # Error handling tests
         print("\n⚠️  ERROR HANDLING TESTS")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark and budget check for the Coffee Shop API.
+
+Launches a fresh interpreter that imports backend/server.py, runs the
+lifespan startup and serves one request in-process, then reports how long
+each step took. Cold start is measured from launching the interpreter to
+receiving the first response, i.e. what an autoscaled worker pays before it
+can serve traffic. The exit status is non-zero when the median cold start
+over --runs exceeds the budget, so this can gate CI.
+
+--profile additionally runs the child under `python -X importtime` and
+lists the most expensive imports.
+
+Examples:
+    # Against an in-memory MongoDB stand-in, failing above 2 seconds
+    python benchmarks/cold_start.py --memory --budget-ms 2000
+
+    # Where does import time go?
+    python benchmarks/cold_start.py --memory --profile
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+DEFAULT_BUDGET_MS = float(os.environ.get('COLD_START_BUDGET_MS', '3000'))
+
+
+async def first_response(server, path):
+    import httpx
+
+    transport = httpx.ASGITransport(app=server.app)
+    started = time.perf_counter()
+    async with server.app.router.lifespan_context(server.app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://cold-start") as http:
+            response = await http.get(path)
+        responded = time.perf_counter()
+        launched_at = float(os.environ['COLD_START_LAUNCHED_AT'])
+        return {
+            "status": response.status_code,
+            "startup_ms": (ready - started) * 1000,
+            "request_ms": (responded - ready) * 1000,
+            "cold_start_ms": (time.time() - launched_at) * 1000,
+        }
+
+
+def child(args):
+    """Runs in the freshly launched interpreter"""
+    started = time.perf_counter()
+    # load_test.load_app imports server, swapping in mongomock for --memory
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from load_test import load_app
+    server = load_app(args.memory)
+    result = {"import_ms": (time.perf_counter() - started) * 1000}
+    result.update(asyncio.run(first_response(server, args.path)))
+    print(json.dumps(result))
+
+
+def launch(args, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += [__file__, "--child", "--path", args.path] + (["--memory"] if args.memory else [])
+    env = {**os.environ, "COLD_START_LAUNCHED_AT": repr(time.time())}
+    completed = subprocess.run(command, capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        sys.exit(f"Cold start run failed:\n{completed.stderr}")
+    # The result is the last stdout line; the app may log before it
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def parse_importtime(stderr):
+    """(self us, cumulative us, depth, module) for every -X importtime line"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def print_profile(rows, top):
+    by_package = defaultdict(int)
+    for self_us, _, _, module in rows:
+        by_package[module.split(".")[0]] += self_us
+    print(f"\nImport time by top-level package (self time), top {top}:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<40}{self_us / 1000:>10.1f} ms")
+
+    # -X importtime prints children before their parent, so server.py's own
+    # imports are the lines just above it that sit one level deeper
+    server_index = next((i for i, row in enumerate(rows) if row[3] == "server"), None)
+    if server_index is None:
+        return
+    server_depth = rows[server_index][2]
+    direct = []
+    for self_us, cumulative_us, depth, module in reversed(rows[:server_index]):
+        if depth <= server_depth:
+            break
+        if depth == server_depth + 1:
+            direct.append((cumulative_us, module))
+    print(f"\nImported by server.py (cumulative), top {top}; server.py total "
+          f"{rows[server_index][1] / 1000:.1f} ms:")
+    for cumulative_us, module in sorted(direct, reverse=True)[:top]:
+        print(f"{module:<40}{cumulative_us / 1000:>10.1f} ms")
+
+
+def main(args):
+    if args.child:
+        child(args)
+        return
+
+    runs = [launch(args)[0] for _ in range(args.runs)]
+    print(f"{'run':<6}{'import ms':>12}{'startup ms':>12}{'request ms':>12}{'cold start ms':>15}{'status':>8}")
+    for number, run in enumerate(runs, 1):
+        print(f"{number:<6}{run['import_ms']:>12.1f}{run['startup_ms']:>12.1f}{run['request_ms']:>12.1f}"
+              f"{run['cold_start_ms']:>15.1f}{run['status']:>8}")
+
+    if args.profile:
+        _, stderr = launch(args, importtime=True)
+        print_profile(parse_importtime(stderr), args.top)
+
+    median = statistics.median(run["cold_start_ms"] for run in runs)
+    if args.output:
+        Path(args.output).write_text(json.dumps(
+            {"budget_ms": args.budget_ms, "median_cold_start_ms": median, "runs": runs}, indent=2
+        ))
+    if any(run["status"] >= 400 for run in runs):
+        sys.exit(f"First request to {args.path} failed")
+    if median > args.budget_ms:
+        sys.exit(f"Cold start {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    print(f"\nCold start {median:.0f} ms (median of {len(runs)}) is within the {args.budget_ms:.0f} ms budget")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memory", action="store_true", help="use an in-memory MongoDB stand-in")
+    parser.add_argument("--path", default="/api/", help="first request to time (default: /api/)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to launch")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="fail above this median cold start (default: $COLD_START_BUDGET_MS or 3000)")
+    parser.add_argument("--profile", action="store_true", help="also report per-module import cost")
+    parser.add_argument("--top", type=int, default=15, help="rows per profile table")
+    parser.add_argument("--output", help="write the runs and the median to this JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
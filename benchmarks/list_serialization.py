@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the list endpoint response pipeline.
+
+Compares the per-row cost of the original path (build a model per document,
+then let FastAPI re-validate against response_model, run jsonable_encoder
+and json.dumps) with the fast path used by GET /api/status and
+GET /api/contact (one bulk validation of the raw documents, serialized in
+one pydantic-core pass).
+
+Usage: python benchmarks/list_serialization.py [rows] [repeats]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import server
+
+
+def status_documents(rows):
+    start = datetime.utcnow()
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"client-{i}", "timestamp": start + timedelta(seconds=i)}
+        for i in range(rows)
+    ]
+
+
+def contact_documents(rows):
+    start = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Customer {i}",
+            "email": f"customer{i}@example.com",
+            "phone": None,
+            "subject": "Catering inquiry",
+            "message": "Could you tell me more about your catering options? " * 20,
+            "timestamp": start + timedelta(seconds=i),
+        }
+        for i in range(rows)
+    ]
+
+
+async def status_before(documents, field):
+    page = server.StatusCheckPage(
+        items=[server.StatusCheck(**document) for document in documents], next_cursor=None
+    )
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def status_after(documents, field):
+    page = {"items": documents, "next_cursor": None}
+    return server.model_json_response(server.STATUS_PAGE_ADAPTER, page).body
+
+
+async def contact_before(documents, field):
+    submissions = [server.ContactSubmission(**document) for document in documents]
+    content = await serialize_response(field=field, response_content=submissions)
+    return JSONResponse(content).body
+
+
+async def contact_after(documents, field):
+    return server.model_json_response(server.CONTACT_LIST_ADAPTER, documents).body
+
+
+async def measure(func, documents, field, repeats):
+    # Copy documents each round so both paths start from fresh dicts
+    best = float("inf")
+    for _ in range(repeats):
+        batch = [dict(document) for document in documents]
+        start = time.perf_counter()
+        await func(batch, field)
+        best = min(best, time.perf_counter() - start)
+    return best / len(documents)
+
+
+async def main(rows, repeats):
+    cases = [
+        ("GET /api/status", status_documents(rows),
+         create_response_field("Response", server.StatusCheckPage), status_before, status_after),
+        ("GET /api/contact", contact_documents(rows),
+         create_response_field("Response", List[server.ContactSubmission]), contact_before, contact_after),
+    ]
+
+    print(f"{rows} rows, best of {repeats} runs")
+    print(f"{'endpoint':<20}{'before us/row':>15}{'after us/row':>15}{'speedup':>10}")
+    for name, documents, field, before, after in cases:
+        # Both paths must produce the same JSON
+        assert await before(documents, field) == await after(documents, field), name
+        before_cost = await measure(before, documents, field, repeats)
+        after_cost = await measure(after, documents, field, repeats)
+        print(f"{name:<20}{before_cost * 1e6:>15.2f}{after_cost * 1e6:>15.2f}"
+              f"{before_cost / after_cost:>9.1f}x")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(main(rows, repeats))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Load-testing and benchmark suite for the Coffee Shop API.
+
+Drives the FastAPI app from backend/server.py in-process over ASGI (no
+network, no deployment needed), or a running server when --url is given.
+Each scenario runs for a fixed duration with a fixed number of concurrent
+clients and reports throughput and latency percentiles. Results can be
+written as JSON and compared against a previous run.
+
+Examples:
+    # In-process, against the MongoDB configured in backend/.env
+    python benchmarks/load_test.py
+
+    # In-process, against an in-memory MongoDB stand-in (mongomock-motor)
+    python benchmarks/load_test.py --memory --output bench.json
+
+    # Against a local uvicorn, comparing with an earlier run
+    python benchmarks/load_test.py --url http://127.0.0.1:8001 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+
+CONTACT_PAYLOAD = {
+    "name": "Benchmark User",
+    "email": "bench@example.com",
+    "subject": "Benchmark",
+    "message": "This is a benchmark message sent by the load testing suite.",
+}
+
+# name -> (method, path, request body factory)
+SCENARIOS = {
+    "status-post": ("POST", "/api/status", lambda n: {"client_name": f"bench-{n}"}),
+    "status-get": ("GET", "/api/status?limit=100", None),
+    "contact-post": ("POST", "/api/contact", lambda n: {**CONTACT_PAYLOAD, "message": f"{CONTACT_PAYLOAD['message']} #{n}"}),
+    "contact-get": ("GET", "/api/contact", None),
+    "contact-get-slim": ("GET", "/api/contact?fields=id,name,subject,timestamp", None),
+    "menu-get": ("GET", "/api/menu", None),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def load_app(memory):
+    """Import the app, optionally swapping Motor for an in-memory stand-in"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    # Every in-process request comes from one address; measure the write
+    # path rather than the contact rate limiter unless asked otherwise
+    os.environ.setdefault('CONTACT_RATE_LIMIT', 'false')
+    if memory:
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("--memory needs mongomock-motor: pip install mongomock-motor")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    import server
+    # server routes the root logger at INFO, which would have httpx log every
+    # benchmark request and add the client's logging to measured latencies
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return server
+
+
+async def seed(server, rows):
+    """Give the GET scenarios realistic collections to read from"""
+    start = datetime.utcnow() - timedelta(seconds=rows)
+    await server.db.status_checks.insert_many([
+        {"id": str(uuid.uuid4()), "client_name": f"seed-{i}", "timestamp": start + timedelta(seconds=i)}
+        for i in range(rows)
+    ])
+    await server.db.contact_submissions.insert_many([
+        {"id": str(uuid.uuid4()), **CONTACT_PAYLOAD, "phone": None, "timestamp": start + timedelta(seconds=i)}
+        for i in range(rows)
+    ])
+
+
+async def run_scenario(http, name, concurrency, duration):
+    method, path, body = SCENARIOS[name]
+    latencies = []
+    errors = 0
+    counter = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop():
+        nonlocal errors, counter
+        while time.perf_counter() < deadline:
+            counter += 1
+            payload = body(counter) if body else None
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, path, json=payload)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - wall_started
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "method": method,
+        "path": path,
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    previous = {r["scenario"]: r for r in baseline["results"]} if baseline else {}
+    print(f"{'scenario':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for result in results:
+        latency = result["latency_ms"]
+        print(f"{result['scenario']:<18}{result['throughput_rps']:>10.1f}{latency['p50']:>10.2f}"
+              f"{latency['p95']:>10.2f}{latency['p99']:>10.2f}{result['errors']:>8}")
+        before = previous.get(result["scenario"])
+        if before:
+            rps_change = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100
+            p95_change = (latency["p95"] / before["latency_ms"]["p95"] - 1) * 100
+            print(f"{'':<18}{rps_change:>+9.1f}%{'':>10}{p95_change:>+9.1f}%")
+
+
+async def main(args):
+    scenarios = args.scenarios or list(SCENARIOS)
+    for name in scenarios:
+        if name not in SCENARIOS:
+            sys.exit(f"Unknown scenario {name!r}, choose from: {', '.join(SCENARIOS)}")
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = []
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as http:
+            for name in scenarios:
+                results.append(await run_scenario(http, name, args.concurrency, args.duration))
+    else:
+        server = load_app(args.memory)
+        transport = httpx.ASGITransport(app=server.app)
+        # ASGITransport does not send lifespan events, so run startup/shutdown here
+        async with server.app.router.lifespan_context(server.app):
+            if args.seed:
+                await seed(server, args.seed)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as http:
+                for name in scenarios:
+                    results.append(await run_scenario(http, name, args.concurrency, args.duration))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "target": args.url or ("in-process (memory)" if args.memory else "in-process"),
+        "results": results,
+    }
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_results(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--memory", action="store_true", help="use an in-memory MongoDB stand-in (in-process only)")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--seed", type=int, default=1000, help="documents to insert before running (in-process only)")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="JSON results from an earlier run to diff against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
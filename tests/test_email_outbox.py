@@ -0,0 +1,128 @@
+"""
+EmailOutbox against an in-memory MongoDB stand-in and a local SMTP stand-in.
+
+    python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+from email import message_from_bytes
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'outbox_test')
+
+import mongomock_motor
+import motor.motor_asyncio
+motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+import server
+
+
+class SMTPStandIn:
+    """Just enough of an SMTP server for smtplib to deliver messages to"""
+
+    def __init__(self):
+        self.messages = []
+        self._server = None
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._session, '127.0.0.1', 0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def _session(self, reader, writer):
+        writer.write(b"220 localhost ready\r\n")
+        while line := await reader.readline():
+            command = line[:4].upper()
+            if command == b"DATA":
+                writer.write(b"354 go ahead\r\n")
+                data = b""
+                while (line := await reader.readline()) != b".\r\n":
+                    data += line[1:] if line.startswith(b"..") else line
+                self.messages.append(message_from_bytes(data))
+                writer.write(b"250 queued\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def make_outbox(database, **overrides):
+    options = dict(workers=1, batch_size=10, max_attempts=3, retry_base=0.05, poll_interval=0.05)
+    options.update(overrides)
+    return server.EmailOutbox(database.email_outbox, **options)
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def run_with_smtp(test, monkeypatch):
+    async def main():
+        async with SMTPStandIn() as smtp:
+            monkeypatch.setattr(server, 'SMTP_HOST', '127.0.0.1')
+            monkeypatch.setattr(server, 'SMTP_PORT', smtp.port)
+            monkeypatch.setattr(server, 'SMTP_STARTTLS', False)
+            database = mongomock_motor.AsyncMongoMockClient()['outbox_test']
+            await test(smtp, database)
+    asyncio.run(main())
+
+
+def test_outbox_delivers_queued_messages(monkeypatch):
+    async def test(smtp, database):
+        outbox = make_outbox(database)
+        outbox.start()
+        await outbox.enqueue(to="owner@example.com", subject="[Contact] Hello",
+                             body="A message", reply_to="customer@example.com")
+
+        async def sent():
+            return await database.email_outbox.count_documents({"status": "sent"}) == 1
+        await wait_for(sent)
+        await outbox.close()
+
+        assert len(smtp.messages) == 1
+        assert smtp.messages[0]["To"] == "owner@example.com"
+        assert smtp.messages[0]["Reply-To"] == "customer@example.com"
+
+    run_with_smtp(test, monkeypatch)
+
+
+def test_outbox_worker_survives_database_errors(monkeypatch):
+    async def test(smtp, database):
+        outbox = make_outbox(database)
+        claim_batch, failures = outbox._claim_batch, []
+
+        async def flaky_claim_batch():
+            if len(failures) < 2:
+                failures.append(1)
+                raise ConnectionError("primary stepped down")
+            return await claim_batch()
+
+        outbox._claim_batch = flaky_claim_batch
+        outbox.start()
+        await outbox.enqueue(to="owner@example.com", subject="[Contact] Hello", body="A message")
+
+        async def sent():
+            return len(smtp.messages) == 1
+        await wait_for(sent)
+        await outbox.close()
+
+        assert len(failures) == 2
+
+    run_with_smtp(test, monkeypatch)